@@ -0,0 +1,177 @@
+import json
+import logging
+import operator
+import os
+import threading
+import time
+import urllib.request
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from metrics import incr, span
+
+# column: a latest-bar column (indicators, Close, Score, Signal); op: a comparison that fires
+# on the bar it becomes true (it was false on the previously evaluated bar), or "changes";
+# threshold: a value, or the name of another column in the row; message: formatted with
+# symbol, value, prev, price, score
+Alert = namedtuple("Alert", "name column op threshold message")
+
+ALERTS = [
+    Alert("strong_buy", "Signal", "==", "STRONG BUY", "🚀 {symbol} flipped to STRONG BUY (score {score})"),
+    Alert("strong_sell", "Signal", "==", "STRONG SELL", "🔻 {symbol} flipped to STRONG SELL (score {score})"),
+    Alert("signal", "Signal", "changes", None, "🔁 {symbol}: {prev} → {value}"),
+    Alert("score_high", "Score", ">=", 75, "📈 {symbol} score reached {value:.0f}"),
+    Alert("score_low", "Score", "<=", 25, "📉 {symbol} score fell to {value:.0f}"),
+    Alert("vwap_up", "Close", ">", "VWAP", "🏦 {symbol} crossed above VWAP at ₹{price:.2f}"),
+    Alert("vwap_down", "Close", "<", "VWAP", "🏦 {symbol} crossed below VWAP at ₹{price:.2f}"),
+    Alert("stop_hit", "SUPERTd_7_3.0", "==", -1, "🛑 {symbol} closed through the SuperTrend stop at ₹{price:.2f}"),
+    Alert("trend_up", "SUPERTd_7_3.0", "==", 1, "📈 {symbol} SuperTrend turned bullish at ₹{price:.2f}"),
+    Alert("rsi_oversold", "RSI_14", "<", 30, "🟢 {symbol} RSI oversold ({value:.0f})"),
+    Alert("rsi_overbought", "RSI_14", ">", 70, "🔴 {symbol} RSI overbought ({value:.0f})"),
+    Alert("bb_upper", "Close", ">", "BBU_20_2.0", "💥 {symbol} pierced the upper Bollinger Band"),
+    Alert("bb_lower", "Close", "<", "BBL_20_2.0", "💥 {symbol} pierced the lower Bollinger Band"),
+]
+
+DEBOUNCE = 300    # seconds before the same alert may fire again for a symbol
+FEED_SIZE = 200   # alerts kept for the in-app feed
+ALERT_FILE = os.environ.get("MM_ALERT_FILE")        # JSON-lines sink when set
+ALERT_WEBHOOK = os.environ.get("MM_ALERT_WEBHOOK")  # POST sink when set
+
+_OPS = {">": operator.gt, "<": operator.lt, ">=": operator.ge, "<=": operator.le, "==": operator.eq}
+
+log = logging.getLogger(__name__)
+
+
+def _version(row):
+    """Changes whenever the symbol's last bar does (new bar or revised forming candle)."""
+    return row.get("bar_ts"), row.get("Close"), row.get("Volume")
+
+
+def _stack(rows, columns):
+    """[{column: scalar}] -> {column: array over rows}; missing values are NaN."""
+    return {c: np.array([r.get(c, np.nan) for r in rows]) for c in columns}
+
+
+def fired(prev, cur, alerts=ALERTS):
+    """Bool array (alerts x symbols): which alerts fire between two stacked rows per symbol."""
+    n = len(cur["Close"])
+    hits = np.zeros((len(alerts), n), dtype=bool)
+    with np.errstate(invalid="ignore"):
+        for i, alert in enumerate(alerts):
+            if alert.column not in cur: continue
+            if alert.op == "changes":
+                before, after = prev[alert.column], cur[alert.column]
+                hits[i] = np.asarray(before != after, bool) & np.asarray(before == before, bool)  # NaN: nothing to change from
+                continue
+            ref_prev = ref_cur = alert.threshold
+            if isinstance(alert.threshold, str) and alert.threshold in cur:
+                ref_prev, ref_cur = prev[alert.threshold], cur[alert.threshold]
+            op = _OPS[alert.op]
+            try: hits[i] = np.asarray(op(cur[alert.column], ref_cur), bool) & ~np.asarray(op(prev[alert.column], ref_prev), bool)
+            except TypeError: pass  # a numeric column against a column no row has
+    return hits
+
+
+class AlertEngine:
+    """Evaluates ALERTS on the latest bar of every refreshed symbol in one vectorized pass.
+
+    Only symbols whose last bar changed since the previous call are compared (against the
+    row they had then); a symbol's first row only primes it. An alert fires on the bar its
+    condition becomes true, and at most once per `debounce` seconds per symbol. Fired alerts
+    go to `feed` (newest last) and to every sink, off the caller's thread.
+    """
+
+    def __init__(self, alerts=ALERTS, sinks=(), debounce=DEBOUNCE, feed_size=FEED_SIZE):
+        self.alerts = alerts
+        self.sinks = list(sinks)
+        self.debounce = debounce
+        self.feed = deque(maxlen=feed_size)
+        self._columns = sorted({"Close", "Score"} | {a.column for a in alerts}
+                               | {a.threshold for a in alerts if isinstance(a.threshold, str)})
+        self._rows = {}   # symbol -> last evaluated row
+        self._last = {}   # (symbol, alert name) -> time it last fired
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-sink")
+
+    def evaluate(self, rows, now=None):
+        """rows: {symbol: latest-bar row (with bar_ts)}. Returns the alerts fired."""
+        now = time.time() if now is None else now
+        with self._lock, span("alerts.evaluate"):
+            changed = {s: r for s, r in rows.items() if _version(r) != _version(self._rows.get(s, {}))}
+            symbols = [s for s in changed if s in self._rows]
+            events = []
+            if symbols:
+                before, after = [self._rows[s] for s in symbols], [changed[s] for s in symbols]
+                columns = [c for c in self._columns if any(c in r for r in before + after)]
+                prev, cur = _stack(before, columns), _stack(after, columns)
+                for i, j in zip(*np.nonzero(fired(prev, cur, self.alerts))):
+                    alert, symbol = self.alerts[i], symbols[j]
+                    if now - self._last.get((symbol, alert.name), -np.inf) < self.debounce: continue
+                    self._last[symbol, alert.name] = now
+                    value = cur[alert.column][j]
+                    events.append({
+                        "time": now, "symbol": symbol, "alert": alert.name,
+                        "message": alert.message.format(symbol=symbol, value=value, prev=prev[alert.column][j],
+                                                        price=cur["Close"][j], score=cur["Score"][j]),
+                    })
+            self._rows.update(changed)
+            self.feed.extend(events)
+        if events:
+            incr("alerts.fired", len(events))
+            for sink in self.sinks: self._pool.submit(self._deliver, sink, events)
+        return events
+
+    def recent(self, limit=20, symbols=None):
+        """Newest alerts first; only those for `symbols` when given (a session's watchlist)."""
+        with self._lock:
+            events = list(self.feed)[::-1]
+        if symbols is not None:
+            symbols = set(symbols)
+            events = [e for e in events if e["symbol"] in symbols]
+        return events[:limit]
+
+    def _deliver(self, sink, events):
+        try: sink(events)
+        except Exception:
+            incr("errors.alert_sink")
+            log.warning("alert sink %r failed", sink, exc_info=True)
+
+
+class FileSink:
+    """Appends each alert as a JSON line."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, events):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for event in events: f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def __repr__(self):
+        return f"FileSink({self.path!r})"
+
+
+class WebhookSink:
+    """POSTs {"alerts": [...]} as JSON to url (a local stand-in works the same)."""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, events):
+        body = json.dumps({"alerts": events}).encode()
+        request = urllib.request.Request(self.url, body, {"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout): pass
+
+    def __repr__(self):
+        return f"WebhookSink({self.url!r})"
+
+
+def default_sinks():
+    """Sinks configured through MM_ALERT_FILE / MM_ALERT_WEBHOOK."""
+    sinks = []
+    if ALERT_FILE: sinks.append(FileSink(ALERT_FILE))
+    if ALERT_WEBHOOK: sinks.append(WebhookSink(ALERT_WEBHOOK))
+    return sinks
@@ -1,15 +1,15 @@
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import pandas_ta as ta
 import streamlit.components.v1 as components
-import feedparser
-import json
 import random
-from datetime import datetime, timezone
-import time
-import urllib.parse
+from datetime import datetime
 import textwrap
+import uuid
+import logging
+from chart import chart_payload, last_chart_time
+from scanner import scan
+from refresher import get_refresher
+from news import dedupe, time_ago
+from metrics import METRICS, incr, timed
 
 # --- 1. CONFIGURATION ---
 st.set_page_config(layout="wide", page_title="Market Monitor", initial_sidebar_state="expanded")
@@ -67,6 +67,12 @@ st.markdown("""
     .news-time { font-size: 11px; color: #58a6ff; font-weight: bold; margin-bottom: 2px; }
     .news-title { font-size: 13px; color: #e6edf3; font-weight: 600; text-decoration: none; }
     .news-title:hover { color: #58a6ff; text-decoration: underline; }
+
+    /* Sector Heatmap */
+    .heatmap { display: grid; grid-template-columns: repeat(3, 1fr); gap: 6px; }
+    .heat-tile { padding: 8px; border-radius: 4px; text-align: center; font-family: monospace; color: #ffffff; }
+    .heat-name { font-size: 11px; font-weight: 600; opacity: 0.85; }
+    .heat-pct { font-size: 14px; font-weight: 700; }
     
     div[data-testid="stMetricValue"] {font-size: 20px !important; color: #e6edf3 !important;}
 </style>
@@ -77,198 +83,31 @@ if 'watchlist' not in st.session_state:
 if 'active_ticker' not in st.session_state:
     st.session_state.active_ticker = "RELIANCE"
 
-# --- 3. HELPER FUNCTIONS ---
-def time_ago(published_parsed):
-    if not published_parsed: return "Just now"
-    now = datetime.now(timezone.utc)
-    pub_dt = datetime.fromtimestamp(time.mktime(published_parsed), timezone.utc)
-    diff = now - pub_dt
-    seconds = diff.total_seconds()
-    if seconds < 60: return "Just now"
-    if seconds < 3600: return f"{int(seconds // 60)}m ago"
-    if seconds < 86400: return f"{int(seconds // 3600)}h ago"
-    return f"{int(seconds // 86400)}d ago"
-
-def fetch_news(query):
-    encoded_query = urllib.parse.quote_plus(query)
-    url = f"https://news.google.com/rss/search?q={encoded_query}&hl=en-IN&gl=IN&ceid=IN:en&t={int(time.time())}"
-    feed = feedparser.parse(url)
-    news_data = []
-    for entry in feed.entries[:6]:
-        news_data.append({
-            "title": entry.title,
-            "link": entry.link,
-            "source": entry.source.title,
-            "time_str": time_ago(entry.published_parsed)
-        })
-    return news_data
+FIRST_SNAPSHOT_WAIT = 8  # seconds a new symbol waits for its first background refresh
+CHART_REBASE = 300  # minutes a mounted chart may lag its base before it is remounted (bounds a full run's catch-up)
 
-def get_market_indices():
-    """Fetches Live NIFTY 50 and NIFTY BANK"""
-    try:
-        tickers = yf.Tickers("^NSEI ^NSEBANK")
-        n50 = tickers.tickers['^NSEI'].fast_info
-        n50_obj = {"price": n50.last_price, "change": n50.last_price - n50.previous_close, "pct": (n50.last_price - n50.previous_close)/n50.previous_close*100}
-        nb = tickers.tickers['^NSEBANK'].fast_info
-        nb_obj = {"price": nb.last_price, "change": nb.last_price - nb.previous_close, "pct": (nb.last_price - nb.previous_close)/nb.previous_close*100}
-        return n50_obj, nb_obj
-    except: return None, None
-
-def get_sector_map(ticker):
-    """Maps Stock to Sector Index"""
-    sector_map = {
-        "RELIANCE": "^CNXENERGY", "ONGC": "^CNXENERGY", "POWERGRID": "^CNXENERGY",
-        "TCS": "^CNXIT", "INFY": "^CNXIT", "WIPRO": "^CNXIT", "HCLTECH": "^CNXIT",
-        "HDFCBANK": "^NSEBANK", "SBIN": "^NSEBANK", "ICICIBANK": "^NSEBANK",
-        "TATASTEEL": "^CNXMETAL", "JINDALSTEL": "^CNXMETAL",
-        "TATAMOTORS": "^CNXAUTO", "M&M": "^CNXAUTO", "TMCV": "^CNXAUTO",
-        "ITC": "^CNXFMCG", "HUL": "^CNXFMCG", "SUNPHARMA": "^CNXPHARMA",
-        "BSE": "^CNXFIN", "CDSL": "^CNXFIN", "ZOMATO": "^CNXIT"
-    }
-    clean_ticker = ticker.replace(".NS", "").replace(".BO", "").upper()
-    return sector_map.get(clean_ticker, "^NSEI")
-
-def get_quant_analysis(ticker):
+# --- 3. HELPER FUNCTIONS ---
+def get_chart_data(ticker, since=None, wait=0):
+    """(JSON candle payload, last candle time) from the refresher's published bars; `since`
+    limits it to candles at/after that time"""
     try:
-        yf_symbol = ticker if ".NS" in ticker else f"{ticker}.NS"
-        df = yf.download(yf_symbol, period="5d", interval="1m", progress=False)
-        if df.empty: return None
-        if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
-        df = df.dropna()
-        
-        # --- FIX FOR VWAP ERROR: Force Sort Index ---
-        df = df.sort_index()
-
-        # Sector Data
-        sector_symbol = get_sector_map(ticker)
-        try:
-            sector_df = yf.download(sector_symbol, period="1d", interval="1d", progress=False)
-            if not sector_df.empty:
-                if isinstance(sector_df.columns, pd.MultiIndex): sector_df.columns = sector_df.columns.get_level_values(0)
-                sec_change = (sector_df['Close'].iloc[-1] - sector_df['Open'].iloc[-1])
-                sec_pct = (sec_change / sector_df['Open'].iloc[-1]) * 100
-                sector_name = sector_symbol.replace("^CNX", "").replace("^NSE", "").replace("I", "")
-            else:
-                sec_pct = 0
-                sector_name = "MARKET"
-        except:
-            sec_pct = 0
-            sector_name = "MARKET"
-
-        # --- INDICATORS ---
-        df['VWAP'] = ta.vwap(df['High'], df['Low'], df['Close'], df['Volume'])
-        df['RSI'] = ta.rsi(df['Close'], length=14)
-        macd = ta.macd(df['Close'])
-        df = df.join(macd)
-        st_data = ta.supertrend(df['High'], df['Low'], df['Close'], length=7, multiplier=3)
-        if st_data is not None: df = df.join(st_data)
-        bb = ta.bbands(df['Close'], length=20, std=2)
-        df = df.join(bb)
-        df['MFI'] = ta.mfi(df['High'], df['Low'], df['Close'], df['Volume'], length=14)
-        adx = ta.adx(df['High'], df['Low'], df['Close'], length=14)
-        df = df.join(adx)
-        ichimoku = ta.ichimoku(df['High'], df['Low'], df['Close'])[0]
-        df = df.join(ichimoku)
-        df['CCI'] = ta.cci(df['High'], df['Low'], df['Close'], length=20)
-        df['WILLR'] = ta.willr(df['High'], df['Low'], df['Close'], length=14)
-
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
-        
-        st_dir = [c for c in df.columns if 'SUPERTd' in c][0]
-        st_val = [c for c in df.columns if 'SUPERT' in c and 'd' not in c][0]
-        
-        # Values
-        close = latest['Close']
-        vwap = latest.get('VWAP', close)
-        rsi = latest.get('RSI_14', 50)
-        macd_line = latest.get('MACD_12_26_9', 0)
-        macd_sig = latest.get('MACDs_12_26_9', 0)
-        mfi = latest.get('MFI_14', 50)
-        adx_val = latest.get('ADX_14', 0)
-        cci = latest.get('CCI_20_0.015', 0)
-        willr = latest.get('WILLR_14', -50)
-        span_a = latest.get('ISA_9', 0)
-        span_b = latest.get('ISB_26', 0)
-        cloud_top = max(span_a, span_b)
-        cloud_bottom = min(span_a, span_b)
-        bb_upper = latest.get('BBU_20_2.0', 0)
-        bb_lower = latest.get('BBL_20_2.0', 0)
-
-        # --- SCORING ---
-        score = 50
-        reasons = []
+        df = (refresher.snapshot(ticker, wait=wait) or {}).get("bars")
+        if df is None: return None, None
+        return chart_payload(ticker, df, since), last_chart_time(df)
+    except Exception:
+        incr("errors.chart")
+        logging.exception("chart data failed for %s", ticker)
+        return None, None
 
-        if sec_pct > 0.2: 
-            score += 5
-            reasons.append(f"🌍 **Sector ({sector_name}):** Bullish ({sec_pct:.2f}%)")
-        elif sec_pct < -0.2:
-            score -= 5
-            reasons.append(f"🌍 **Sector ({sector_name}):** Bearish ({sec_pct:.2f}%)")
-
-        if latest[st_dir] == 1: score += 10; reasons.append("📈 **SuperTrend:** Bullish")
-        else: score -= 10; reasons.append("📉 **SuperTrend:** Bearish")
-
-        if close > vwap: score += 10; reasons.append("🏦 **VWAP:** Price > Inst. Avg")
-        else: score -= 10; reasons.append("🏦 **VWAP:** Price < Inst. Avg")
-
-        if rsi < 30: score += 5; reasons.append(f"🟢 **RSI:** Oversold ({rsi:.0f})")
-        elif rsi > 70: score -= 5; reasons.append(f"🔴 **RSI:** Overbought ({rsi:.0f})")
-
-        if macd_line > macd_sig: score += 5; reasons.append("🟢 **MACD:** Bullish Cross")
-        else: score -= 5; reasons.append("🔴 **MACD:** Bearish Cross")
-            
-        if mfi < 20: score += 5; reasons.append("💰 **MFI:** Accumulation")
-        elif mfi > 80: score -= 5; reasons.append("💰 **MFI:** Distribution")
-
-        if adx_val > 25: score += 5; reasons.append(f"💪 **ADX:** Strong Trend")
-        
-        if close > cloud_top: score += 10; reasons.append("☁️ **Ichimoku:** Above Cloud")
-        elif close < cloud_bottom: score -= 10; reasons.append("☁️ **Ichimoku:** Below Cloud")
-
-        if close > bb_upper: score -= 5; reasons.append("💥 **BBands:** Upper Pierce")
-        elif close < bb_lower: score += 5; reasons.append("💥 **BBands:** Lower Pierce")
-
-        if cci > 100: score += 5; reasons.append("🔄 **CCI:** Upside Momentum")
-        elif cci < -100: score -= 5; reasons.append("🔄 **CCI:** Downside Momentum")
-
-        if willr < -80: score += 5; reasons.append("📉 **Will%R:** Oversold")
-        elif willr > -20: score -= 5; reasons.append("📈 **Will%R:** Overbought")
-
-        score = max(0, min(100, score))
-        signal = "NEUTRAL"
-        if score >= 75: signal = "STRONG BUY"
-        elif score >= 60: signal = "BUY"
-        elif score <= 25: signal = "STRONG SELL"
-        elif score <= 40: signal = "SELL"
-        
-        news = fetch_news(f"{ticker} stock news")
-        
-        return {
-            "price": close, "vwap": vwap, "signal": signal, "score": score, "reasons": reasons, 
-            "stop_loss": latest[st_val], "change": close - prev['Close'],
-            "pct": (close - prev['Close']) / prev['Close'] * 100,
-            "news": news
-        }
-    except Exception as e: return None
-
-def get_chart_data(ticker):
-    try:
-        yf_symbol = ticker if ".NS" in ticker else f"{ticker}.NS"
-        df = yf.download(yf_symbol, period="5d", interval="1m", progress=False)
-        if df.empty: return None
-        if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
-        df = df.dropna()
-        chart_data = []
-        df_sorted = df.sort_index()
-        for index, row in df_sorted.iterrows():
-            t = int(index.timestamp()) + 19800 
-            chart_data.append({
-                "time": t, "open": float(row['Open']), "high": float(row['High']),
-                "low": float(row['Low']), "close": float(row['Close'])
-            })
-        return chart_data
-    except: return None
+@st.fragment(run_every=10)
+def debug_zone():
+    snap = METRICS.snapshot()
+    ms = st.column_config.NumberColumn(format="%.1f")
+    st.caption("Stages (ms)")
+    st.dataframe([{"Stage": name, **s} for name, s in snap["spans"].items()], hide_index=True, column_config={
+        "total_ms": ms, "avg_ms": ms, "max_ms": ms, "last_ms": ms})
+    st.caption("Counters")
+    st.dataframe([{"Event": name, "Count": n} for name, n in snap["counters"].items()], hide_index=True)
 
 # --- 4. SIDEBAR ---
 with st.sidebar:
@@ -292,71 +131,133 @@ with st.sidebar:
             if st.session_state.active_ticker == ticker:
                 st.session_state.active_ticker = st.session_state.watchlist[0] if st.session_state.watchlist else ""
             st.rerun()
+    st.markdown("---")
+    view = st.radio("View", ["Chart", "Scanner"], horizontal=True)
+    if view == "Scanner":
+        scan_list = st.text_area("Scan symbols", placeholder="Blank = watchlist. Comma separated NSE symbols.")
+    if st.toggle("Debug metrics"): debug_zone()
+
+# --- SCANNER MODE ---
+if view == "Scanner":
+    scan_symbols = [s.strip() for s in scan_list.replace("\n", ",").split(",") if s.strip()] or st.session_state.watchlist
+
+    @st.fragment(run_every=10)
+    @timed("render.scanner")
+    def scanner_zone():
+        table = scan(scan_symbols)
+        if table is None:
+            st.info("No data")
+            return
+        st.caption(f"{len(table)} symbols • {datetime.now().strftime('%H:%M:%S')}")
+        st.dataframe(table, hide_index=True, height=min(800, 36 * (len(table) + 1)), column_config={
+            "Score": st.column_config.ProgressColumn("Score", min_value=0, max_value=100, format="%d"),
+            "LTP": st.column_config.NumberColumn(format="₹%.2f"),
+            "Chg %": st.column_config.NumberColumn(format="%+.2f%%"),
+            "VWAP": st.column_config.NumberColumn(format="₹%.2f"),
+            "Stop Loss": st.column_config.NumberColumn(format="₹%.2f"),
+        })
+    scanner_zone()
+    st.stop()
 
 active = st.session_state.active_ticker
 if not active: st.stop()
 
-# --- 5. STICKY HEADER ---
-@st.fragment(run_every=10)
-def sticky_header_zone():
-    data = get_quant_analysis(active)
-    n50, nbank = get_market_indices()
-    
-    if data:
-        # Market Ticker HTML
-        market_html = ""
-        if n50 and nbank:
-            n50_c = "#2ea043" if n50['change'] >=0 else "#da3633"
-            nb_c = "#2ea043" if nbank['change'] >=0 else "#da3633"
-            market_html = f'<div class="market-ticker"><div class="index-item"><span class="index-name">NIFTY 50</span><span class="index-val" style="color:{n50_c};">{n50["price"]:,.0f} ({n50["pct"]:+.2f}%)</span></div><div class="index-item"><span class="index-name">NIFTY BANK</span><span class="index-val" style="color:{nb_c};">{nbank["price"]:,.0f} ({nbank["pct"]:+.2f}%)</span></div></div>'
+# Data comes from the shared background refresher; this session only registers what it shows
+refresher = get_refresher()
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 
-        # Colors
-        p_color = '#2ea043' if data['change'] >= 0 else '#da3633'
-        s_color = '#2ea043' if 'BUY' in data['signal'] else '#da3633' if 'SELL' in data['signal'] else '#d29922'
+def read_snapshot():
+    """Heartbeat this session's symbols and return the active symbol's snapshot"""
+    refresher.watch(st.session_state.session_id, [active] + st.session_state.watchlist)
+    return refresher.snapshot(active, wait=FIRST_SNAPSHOT_WAIT) or {}
 
-        # Flattened HTML
-        header_html = textwrap.dedent(f"""
-            <div class="sticky-header">
-                {market_html}
-                <div style="display: flex; justify-content: space-between; align-items: flex-end;">
-                    <div>
-                        <div class="stock-title">{active}</div>
-                        <div class="stock-sub">NSE • Sector-Aware Quant • {datetime.now().strftime('%H:%M:%S')}</div>
-                    </div>
-                    <div style="text-align: right;">
-                        <div style="font-size: 12px; color: #8b949e;">LTP</div>
-                        <div style="font-size: 24px; color: {p_color}; font-weight: bold;">₹{data['price']:.2f}</div>
-                        <div style="font-size: 14px; color: {p_color};">{data['change']:.2f} ({data['pct']:.2f}%)</div>
-                    </div>
-                    <div style="text-align: right;">
-                        <div style="font-size: 12px; color: #8b949e;">SIGNAL</div>
-                        <div style="font-size: 18px; color: {s_color}; font-weight: bold;">{data['signal']}</div>
-                    </div>
-                    <div style="text-align: right;">
-                        <div style="font-size: 12px; color: #8b949e;">VWAP</div>
-                        <div style="font-size: 18px; color: #58a6ff;">₹{data['vwap']:.2f}</div>
-                    </div>
-                    <div style="text-align: right;">
-                        <div style="font-size: 12px; color: #8b949e;">STOP LOSS</div>
-                        <div style="font-size: 18px; color: #e6edf3;">₹{data['stop_loss']:.2f}</div>
-                    </div>
+# --- 5. STICKY HEADER ---
+def header_html(ticker, data, n50, nbank):
+    # Market Ticker HTML
+    market_html = ""
+    if n50 and nbank:
+        n50_c = "#2ea043" if n50['change'] >=0 else "#da3633"
+        nb_c = "#2ea043" if nbank['change'] >=0 else "#da3633"
+        market_html = f'<div class="market-ticker"><div class="index-item"><span class="index-name">NIFTY 50</span><span class="index-val" style="color:{n50_c};">{n50["price"]:,.0f} ({n50["pct"]:+.2f}%)</span></div><div class="index-item"><span class="index-name">NIFTY BANK</span><span class="index-val" style="color:{nb_c};">{nbank["price"]:,.0f} ({nbank["pct"]:+.2f}%)</span></div></div>'
+
+    # Colors
+    p_color = '#2ea043' if data['change'] >= 0 else '#da3633'
+    s_color = '#2ea043' if 'BUY' in data['signal'] else '#da3633' if 'SELL' in data['signal'] else '#d29922'
+
+    # Flattened HTML
+    return textwrap.dedent(f"""
+        <div class="sticky-header">
+            {market_html}
+            <div style="display: flex; justify-content: space-between; align-items: flex-end;">
+                <div>
+                    <div class="stock-title">{ticker}</div>
+                    <div class="stock-sub">NSE • Sector-Aware Quant • {datetime.now().strftime('%H:%M:%S')}</div>
+                </div>
+                <div style="text-align: right;">
+                    <div style="font-size: 12px; color: #8b949e;">LTP</div>
+                    <div style="font-size: 24px; color: {p_color}; font-weight: bold;">₹{data['price']:.2f}</div>
+                    <div style="font-size: 14px; color: {p_color};">{data['change']:.2f} ({data['pct']:.2f}%)</div>
+                </div>
+                <div style="text-align: right;">
+                    <div style="font-size: 12px; color: #8b949e;">SIGNAL</div>
+                    <div style="font-size: 18px; color: {s_color}; font-weight: bold;">{data['signal']}</div>
+                </div>
+                <div style="text-align: right;">
+                    <div style="font-size: 12px; color: #8b949e;">VWAP</div>
+                    <div style="font-size: 18px; color: #58a6ff;">₹{data['vwap']:.2f}</div>
+                </div>
+                <div style="text-align: right;">
+                    <div style="font-size: 12px; color: #8b949e;">STOP LOSS</div>
+                    <div style="font-size: 18px; color: #e6edf3;">₹{data['stop_loss']:.2f}</div>
                 </div>
             </div>
-        """)
-        st.markdown(header_html, unsafe_allow_html=True)
+        </div>
+    """)
+
+@st.fragment(run_every=10)
+@timed("render.header")
+def sticky_header_zone():
+    data = read_snapshot().get("data")
+    if data:
+        n50, nbank = refresher.market.get("indices") or (None, None)
+        st.markdown(header_html(active, data, n50, nbank), unsafe_allow_html=True)
 
 sticky_header_zone()
 
 # --- 6. WORKSPACE ---
 col_chart, col_intel = st.columns([7, 3], gap="medium")
 
-# LEFT: STATIC CHART
+# LEFT: LIVE CHART
+# The chart iframe is mounted once per symbol (its HTML stays byte-identical across reruns, so
+# Streamlit keeps it alive) and a small feed fragment pushes new/updated candles via series.update().
+# chart_pushed is the last candle this session pushed: each tick resends it (it may still be
+# forming) plus anything newer, so sessions that are caught up share one cached payload.
+@st.fragment(run_every=10)
+@timed("render.chart_feed")
+def chart_feed_zone(chart_id):
+    payload, last_time = get_chart_data(active, st.session_state.chart_pushed)
+    if not payload: return
+    if last_time - st.session_state.chart_mount["last"] > CHART_REBASE * 60:
+        st.session_state.chart_mount = None
+        st.rerun()
+    components.html(textwrap.dedent(f"""
+    <script>
+        (function() {{
+            const feeds = window.parent.__marketCharts || {{}};
+            try {{ if (feeds['{chart_id}']) feeds['{chart_id}']({payload}); }} catch (e) {{}}
+        }})();
+    </script>
+    """), height=0)
+    st.session_state.chart_pushed = last_time
+
 with col_chart:
-    chart_json = get_chart_data(active)
-    if chart_json:
-        json_data = json.dumps(chart_json)
-        chart_id = f"chart_{active}"
-        
+    chart_id = f"chart_{active}"
+    mount = st.session_state.get("chart_mount")
+    if not mount or mount["id"] != chart_id:
+        json_data, last_time = get_chart_data(active, wait=FIRST_SNAPSHOT_WAIT)
+        mount = st.session_state.chart_mount = {"id": chart_id, "data": json_data, "last": last_time} if json_data else None
+    if mount:
         html_code = textwrap.dedent(f"""
         <div style="position: relative; width: 100%; height: 600px;">
             <div id="{chart_id}" style="width: 100%; height: 100%; background-color: #0e1117;"></div>
@@ -373,7 +274,19 @@ with col_chart:
                     rightPriceScale: {{ borderColor: '#2B2B43' }},
                 }});
                 const candleSeries = chart.addCandlestickSeries({{ upColor: '#26a69a', downColor: '#ef5350', borderVisible: false, wickUpColor: '#26a69a', wickDownColor: '#ef5350' }});
-                candleSeries.setData({json_data});
+                const toCandles = c => c.time.map((t, i) => ({{ time: t, open: c.open[i], high: c.high[i], low: c.low[i], close: c.close[i] }}));
+                const base = {mount["data"]};
+                candleSeries.setData(toCandles(base));
+                let lastTime = base.time.length ? base.time[base.time.length - 1] : 0;
+                // feed entry point for chart_feed_zone: only candles at/after the last one are applied
+                window.parent.__marketCharts = window.parent.__marketCharts || {{}};
+                window.parent.__marketCharts['{chart_id}'] = function(cols) {{
+                    toCandles(cols).forEach(bar => {{
+                        if (bar.time < lastTime) return;
+                        candleSeries.update(bar);
+                        lastTime = bar.time;
+                    }});
+                }};
                 new ResizeObserver(entries => {{
                     if (entries.length === 0) return;
                     const newRect = entries[0].contentRect;
@@ -384,12 +297,54 @@ with col_chart:
         </script>
         """)
         components.html(html_code, height=600)
+        st.session_state.chart_pushed = mount["last"]  # a full run may remount the iframe with only its base candles
+        chart_feed_zone(chart_id)
 
 # RIGHT: LIVE INTEL
+def render_news(slot, items, border=None):
+    with slot:
+        if not items:
+            st.info("No News")
+            return
+        style = f' style="border-left: 3px solid {border};"' if border else ""
+        for item in items:
+            st.markdown(f"""
+            <div class="news-card"{style}>
+                <div class="news-time">{time_ago(item['published'])} • {item['source']}</div>
+                <a href="{item['link']}" target="_blank" class="news-title">{item['title']}</a>
+            </div>""", unsafe_allow_html=True)
+
+def render_heatmap(slot, sectors):
+    with slot:
+        if sectors is None or sectors.empty:
+            st.info("No Sector Data")
+            return
+        tiles = []
+        for name, pct in zip(sectors["Name"], sectors["Day %"]):
+            alpha = 0.25 + 0.75 * min(abs(pct) / 2, 1)  # full colour at a 2% move
+            rgb = "46,160,67" if pct >= 0 else "218,54,51"
+            tiles.append(f'<div class="heat-tile" style="background-color: rgba({rgb},{alpha:.2f});">'
+                         f'<div class="heat-name">{name}</div><div class="heat-pct">{pct:+.2f}%</div></div>')
+        st.markdown(f'<div class="heatmap">{"".join(tiles)}</div>', unsafe_allow_html=True)
+
+def render_alerts(slot, events):
+    with slot:
+        if not events:
+            st.info("No Alerts")
+            return
+        for event in events:
+            st.markdown(f"""
+            <div class="news-card" style="border-left: 3px solid #d29922;">
+                <div class="news-time">{datetime.fromtimestamp(event['time']).strftime('%H:%M:%S')} • {event['symbol']}</div>
+                <div class="news-title">{event['message']}</div>
+            </div>""", unsafe_allow_html=True)
+
 with col_intel:
     @st.fragment(run_every=10)
+    @timed("render.intel")
     def live_intel_zone():
-        data = get_quant_analysis(active)
+        snap = read_snapshot()
+        data = snap.get("data")
         if data:
             color = "score-badge" if data['score'] > 60 else "score-badge-red" if data['score'] < 40 else "score-badge-yellow"
             
@@ -407,24 +362,11 @@ with col_intel:
             """)
             st.markdown(report_html, unsafe_allow_html=True)
 
-            st.caption(f"🟢 Live News")
-            t1, t2 = st.tabs(["Stock", "Market"])
-            with t1:
-                if data['news']:
-                    for item in data['news']:
-                        st.markdown(f"""
-                        <div class="news-card">
-                            <div class="news-time">{item['time_str']} • {item['source']}</div>
-                            <a href="{item['link']}" target="_blank" class="news-title">{item['title']}</a>
-                        </div>""", unsafe_allow_html=True)
-                else: st.info("No News")
-            with t2:
-                m_news = fetch_news("Indian Stock Market")
-                for item in m_news:
-                    st.markdown(f"""
-                    <div class="news-card" style="border-left: 3px solid #f9a825;">
-                        <div class="news-time">{item['time_str']} • {item['source']}</div>
-                        <a href="{item['link']}" target="_blank" class="news-title">{item['title']}</a>
-                    </div>""", unsafe_allow_html=True)
+        st.caption(f"🟢 Live News")
+        t1, t2, t3, t4 = st.tabs(["Stock", "Market", "Sectors", "Alerts"])
+        stock_news, market_news = dedupe(snap.get("news"), refresher.market.get("news"))
+        render_news(t1, stock_news)
+        render_news(t2, market_news, "#f9a825")
+        render_heatmap(t3, refresher.market.get("sectors"))
+        render_alerts(t4, refresher.alerts.recent(symbols=[active] + st.session_state.watchlist))
     live_intel_zone()
-
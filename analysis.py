@@ -0,0 +1,49 @@
+import logging
+
+from indicators import latest_indicators
+from market_data import get_bars, get_index_quotes, get_sector_map, index_name, to_yf_symbol
+from metrics import incr
+from scoring import explain, score_frame
+from timeframes import mtf_indicators
+
+log = logging.getLogger(__name__)
+
+
+def get_sector_strength(ticker, quotes=None):
+    """Day change % of the stock's sector index -> (pct, name), from the shared quote snapshot"""
+    sector_symbol = get_sector_map(ticker)
+    quotes = get_index_quotes() if quotes is None else quotes
+    if quotes is None or sector_symbol not in quotes.index: return 0, "MARKET"
+    return quotes.at[sector_symbol, "Day %"], index_name(sector_symbol)
+
+
+def get_quant_analysis(ticker, df=None, sector=None):
+    """Scores the latest bar. Fetches anything not passed in; sector=None scores without it."""
+    try:
+        yf_symbol = to_yf_symbol(ticker)
+        if df is None: df = get_bars(yf_symbol, "1m", "5d")
+        if df is None or len(df) < 2: return None
+        sec_pct, sector_name = sector or (0, "MARKET")
+
+        # --- INDICATORS (streaming, only new bars are processed; closed 5m/15m/1h bars resampled locally) ---
+        latest = {**df.iloc[-1].to_dict(), **latest_indicators(yf_symbol, df), **mtf_indicators(yf_symbol, df),
+                  "SECTOR_PCT": sec_pct}
+        prev = df.iloc[-2]
+        close = latest['Close']
+        vwap = latest.get('VWAP', close)
+
+        # --- SCORING ---
+        scores, signals = score_frame(latest)
+        score, signal = int(scores[-1]), str(signals[-1])
+        reasons = explain(latest, sector=sector_name)
+        
+        return {
+            "price": close, "vwap": vwap, "signal": signal, "score": score, "reasons": reasons, 
+            "stop_loss": latest['SUPERT_7_3.0'], "change": close - prev['Close'],
+            "pct": (close - prev['Close']) / prev['Close'] * 100,
+            "row": {**latest, "Score": score, "Signal": signal},  # everything the alert engine can test
+        }
+    except Exception:
+        incr("errors.analysis")
+        log.exception("analysis failed for %s", ticker)
+        return None
@@ -0,0 +1,205 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from indicators import compute_panel
+from bar_store import BarStore
+from bars import epoch_seconds
+from market_data import DATA_DIR, EXCHANGE_TZ, clean_ticker, download_bars, get_sector_map, to_yf_symbol
+from scoring import score_frame
+from timeframes import mtf_panel
+
+DEFAULT_DATA_DIR = DATA_DIR
+
+
+# --- DATA (local cache only) ---
+def _cache_path(symbol, interval, data_dir, ext):
+    return os.path.join(data_dir, f"{clean_ticker(symbol)}_{interval}.{ext}")
+
+
+def load_cached(symbol, interval="1m", data_dir=DEFAULT_DATA_DIR, days=None):
+    """OHLCV for a symbol from the bar store under data_dir (what the dashboard records), else
+    from a flat <data_dir>/<SYMBOL>_<interval>.parquet (or .csv). None if not cached."""
+    df = BarStore(data_dir, tz=EXCHANGE_TZ).read(clean_ticker(symbol), interval, days=days)
+    if df is not None: return df
+    for ext in ("parquet", "csv"):
+        path = _cache_path(symbol, interval, data_dir, ext)
+        if not os.path.exists(path): continue
+        df = pd.read_parquet(path) if ext == "parquet" else pd.read_csv(path, index_col=0)
+        df.index = pd.to_datetime(df.index, utc=True).tz_convert(EXCHANGE_TZ)
+        return df[['Open', 'High', 'Low', 'Close', 'Volume']].dropna().sort_index()
+    return None
+
+
+def cache_bars(symbol, interval="1m", period="7d", data_dir=DEFAULT_DATA_DIR):
+    """Download once and merge into the bar store (Yahoo keeps ~30 days of 1m, 60 of 5m)."""
+    new = download_bars(to_yf_symbol(symbol), interval, period)
+    if new is None: return None
+    BarStore(data_dir, tz=EXCHANGE_TZ).write(clean_ticker(symbol), new, interval)
+    return new
+
+
+def _align(frames):
+    """Stack per-symbol frames on a shared time axis. Missing bars are padded (price ffill,
+    volume 0) and flagged False in the returned mask so they never open positions."""
+    index = frames[0].index
+    for df in frames[1:]: index = index.union(df.index)
+    panel, mask = {}, np.column_stack([index.isin(df.index) for df in frames])
+    for field in ('Open', 'High', 'Low', 'Close', 'Volume'):
+        block = pd.concat([df[field].reindex(index) for df in frames], axis=1)
+        panel[field] = (block.fillna(0) if field == 'Volume' else block.ffill()).to_numpy(dtype=float)
+    return index, panel, mask
+
+
+def _sector_pct(df, index):
+    """Day change % of a sector index as of each bar of index (its latest bar at or before
+    it, vs that session's open), like the live quote's Day %. NaN without sector bars."""
+    if df is None: return np.full(len(index), np.nan)
+    day_open = df['Open'].groupby(df.index.normalize()).transform('first')
+    pct = (df['Close'] - day_open) / day_open * 100
+    return pct.reindex(pct.index.union(index)).ffill().reindex(index).to_numpy()
+
+
+# --- SIMULATION ---
+def _shift(x, fill=np.nan):
+    return np.vstack([np.full((1, x.shape[1]), fill), x[:-1]])
+
+
+def simulate(close, score, stop, sessions, mask=None, long_above=60, short_below=40, allow_short=False,
+             cost_bps=3.0, slippage_bps=2.0, flat_eod=True):
+    """Vectorized position / PnL simulation over (bars x symbols) arrays.
+
+    A position is wanted while the score is at or beyond the BUY (or SELL) threshold. A close
+    through the previous bar's SuperTrend stop exits and stays flat until the wanted position
+    changes or a new session starts. Positions are decided on a bar's close and earn the next
+    bar's return; every unit of turnover pays cost + slippage. `mask` flags real bars: a
+    padded one holds the last real bar's wanted position, so it never opens or closes a trade
+    by itself. Returns (target, pnl) arrays, pnl as a fraction of notional.
+    """
+    want = np.where(score >= long_above, 1, 0)
+    if allow_short: want = np.where(score <= short_below, -1, want)
+    if mask is not None:
+        # a padded bar only blocks new entries: it carries the last real bar's wanted position
+        rows = np.arange(len(want))[:, None]
+        last_real = np.maximum.accumulate(np.where(mask, rows, 0), axis=0)
+        want = np.take_along_axis(np.where(mask, want, 0), last_real, axis=0)
+
+    new_day = np.r_[True, sessions[1:] != sessions[:-1]][:, None]
+    segment_start = np.vstack([np.ones((1, want.shape[1]), bool), want[1:] != want[:-1]]) | new_day
+
+    prev_stop = _shift(stop)
+    with np.errstate(invalid="ignore"):
+        hit = ((want > 0) & (close < prev_stop)) | ((want < 0) & (close > prev_stop))
+    hits = np.cumsum(hit, axis=0)
+    # hits already counted when the current segment began (cumsum is monotonic, so the
+    # running max of the values recorded at segment starts is the current segment's base)
+    base = np.maximum.accumulate(np.where(segment_start, hits - hit, 0), axis=0)
+    target = np.where(hits - base > 0, 0, want)
+    if flat_eod: target[np.r_[sessions[1:] != sessions[:-1], True]] = 0
+
+    held = _shift(target, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ret = np.nan_to_num(close / _shift(close) - 1)
+    pnl = held * ret - np.abs(target - held) * (cost_bps + slippage_bps) / 1e4
+    return target, pnl
+
+
+def _drawdown(equity):
+    return np.max(np.maximum.accumulate(equity, axis=0) - equity, axis=0)
+
+
+def _trade_stats(target, pnl, cost):
+    """(trades, winners) per column. A trade runs from entry/flip until the position changes."""
+    held = _shift(target, 0)
+    entry = (target != 0) & (target != held)
+    trade_id = np.cumsum(entry, axis=0)
+    held_id = np.where(held != 0, _shift(trade_id, 0), 0)  # bar t's return belongs to the trade held into it
+    trades = trade_id[-1]
+    offsets = np.concatenate([[0], np.cumsum(trades + 1)[:-1]])
+    keys = (held_id + offsets).ravel()
+    gross = pnl + np.abs(target - held) * cost  # = held * bar return
+    gross = np.bincount(keys, weights=gross.ravel(), minlength=int((trades + 1).sum()))
+    winners = []
+    for j, n in enumerate(trades):
+        per_trade = gross[offsets[j] + 1: offsets[j] + 1 + n] - 2 * cost
+        winners.append(int((per_trade > 0).sum()))
+    return trades, np.array(winners)
+
+
+def run_backtest(symbols, interval="1m", data_dir=DEFAULT_DATA_DIR, capital=100000, chunk=10, days=None, **sim):
+    """Backtest the quant score on cached bars (the last `days` sessions, or all).
+
+    The sector rule reads each symbol's sector index from the same cache; symbols whose
+    sector is not cached are scored without it (listed in report.attrs["no_sector"]).
+    Returns a per-symbol report plus a PORTFOLIO row."""
+    frames = {clean_ticker(s): load_cached(s, interval, data_dir, days) for s in symbols}
+    missing = [s for s, df in frames.items() if df is None or len(df) < 2]
+    names = [s for s in frames if s not in missing]
+    sectors = {s: load_cached(get_sector_map(s), interval, data_dir, days) for s in {get_sector_map(n) for n in names}}
+    cost = (sim.get('cost_bps', 3.0) + sim.get('slippage_bps', 2.0)) / 1e4
+    rows, curves = [], []
+    for i in range(0, len(names), chunk):
+        batch = names[i:i + chunk]
+        index, panel, mask = _align([frames[s] for s in batch])
+        sessions = index.normalize().asi8
+        ind = compute_panel(panel['High'], panel['Low'], panel['Close'], panel['Volume'], sessions)
+        mtf = mtf_panel(epoch_seconds(index), panel['High'], panel['Low'], panel['Close'], panel['Volume'])
+        flat = {k: v.ravel() for k, v in {**ind, **mtf}.items()}
+        flat['Close'] = panel['Close'].ravel()
+        flat['SECTOR_PCT'] = np.column_stack([_sector_pct(sectors[get_sector_map(s)], index) for s in batch]).ravel()
+        score = score_frame(flat)[0].reshape(panel['Close'].shape)
+        target, pnl = simulate(panel['Close'], score, ind['SUPERT_7_3.0'], sessions, mask, **sim)
+        trades, winners = _trade_stats(target, pnl, cost)
+        equity = np.cumsum(pnl, axis=0)
+        drawdown = _drawdown(equity)
+        for j, name in enumerate(batch):
+            rows.append({"Symbol": name, "Bars": int(mask[:, j].sum()), "Trades": int(trades[j]),
+                         "Hit Rate %": 100 * winners[j] / trades[j] if trades[j] else np.nan,
+                         "PnL": capital * equity[-1, j], "Return %": 100 * equity[-1, j],
+                         "Max DD %": 100 * drawdown[j]})
+            curves.append(pd.Series(pnl[:, j], index=index, name=name))
+    if not rows: return None
+    report = pd.DataFrame(rows)
+    portfolio = pd.concat(curves, axis=1).fillna(0).mean(axis=1).cumsum().to_numpy()[:, None]
+    report.loc[len(report)] = {
+        "Symbol": "PORTFOLIO", "Bars": int(report["Bars"].sum()), "Trades": int(report["Trades"].sum()),
+        "Hit Rate %": np.average(report["Hit Rate %"].fillna(0), weights=report["Trades"]) if report["Trades"].sum() else np.nan,
+        "PnL": report["PnL"].sum(), "Return %": 100 * portfolio[-1, 0], "Max DD %": 100 * _drawdown(portfolio)[0]}
+    report.attrs["missing"] = missing
+    report.attrs["no_sector"] = [s for s in names if sectors[get_sector_map(s)] is None]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the quant score on locally cached bars.")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--download", metavar="PERIOD", help="refresh the local cache from Yahoo first, e.g. 7d")
+    parser.add_argument("--days", type=int, help="only the last N cached sessions")
+    parser.add_argument("--capital", type=float, default=100000)
+    parser.add_argument("--cost-bps", type=float, default=3.0)
+    parser.add_argument("--slippage-bps", type=float, default=2.0)
+    parser.add_argument("--long-above", type=float, default=60)
+    parser.add_argument("--short-below", type=float, default=40)
+    parser.add_argument("--shorts", action="store_true", help="also take SELL signals short")
+    parser.add_argument("--hold-overnight", action="store_true")
+    args = parser.parse_args()
+
+    if args.download:
+        for symbol in {*args.symbols, *map(get_sector_map, args.symbols)}:
+            cache_bars(symbol, args.interval, args.download, args.data_dir)
+    report = run_backtest(args.symbols, args.interval, args.data_dir, args.capital, days=args.days,
+                          long_above=args.long_above, short_below=args.short_below, allow_short=args.shorts,
+                          cost_bps=args.cost_bps, slippage_bps=args.slippage_bps, flat_eod=not args.hold_overnight)
+    if report is None:
+        parser.exit(1, "No cached data. Run with --download first.\n")
+    if report.attrs["missing"]: print(f"Skipped (not cached): {', '.join(report.attrs['missing'])}")
+    if report.attrs["no_sector"]: print(f"Scored without sector (index not cached): {', '.join(report.attrs['no_sector'])}")
+    print(report.to_string(index=False, float_format=lambda x: f"{x:,.2f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+SCHEMA = pa.schema([("time", pa.timestamp("ns", tz="UTC"))] + [(f, pa.float64()) for f in FIELDS])
+SUFFIX = ".arrow"
+
+
+class BarStore:
+    """On-disk OHLCV store: <root>/<interval>/<symbol>/<YYYY-MM-DD>.arrow, one file per session.
+
+    Files are uncompressed Arrow IPC so reads are memory-mapped rather than parsed, and only
+    the partitions a lookback needs are opened. A one-session read hands pandas read-only
+    views of the mapped price columns; longer reads concatenate them once. Writes merge into the existing session file
+    (later bars win) and land via an atomic rename, so readers never see a half-written file.
+    """
+
+    def __init__(self, root, tz="UTC"):
+        self.root = root
+        self.tz = tz
+        self._lock = threading.Lock()
+
+    def _dir(self, symbol, interval):
+        return os.path.join(self.root, interval, symbol)
+
+    def dates(self, symbol, interval="1m"):
+        """Stored session dates (YYYY-MM-DD), oldest first."""
+        try: names = os.listdir(self._dir(symbol, interval))
+        except FileNotFoundError: return []
+        return sorted(n[:-len(SUFFIX)] for n in names if n.endswith(SUFFIX))
+
+    def symbols(self, interval="1m"):
+        try: return sorted(os.listdir(os.path.join(self.root, interval)))
+        except FileNotFoundError: return []
+
+    def _read_table(self, path):
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def _to_frame(self, table):
+        table = table.combine_chunks()  # one copy when sessions were concatenated, none for one file
+        columns = {f: table.column(f).chunk(0).to_numpy(zero_copy_only=True) for f in FIELDS}
+        df = pd.DataFrame(columns, index=pd.DatetimeIndex(table.column("time").to_pandas()).tz_convert(self.tz), copy=False)
+        df.index.name = None
+        return df
+
+    def read(self, symbol, interval="1m", days=None, start=None, end=None):
+        """Bars for the last `days` stored sessions and/or sessions in [start, end]
+        (dates or 'YYYY-MM-DD'). None when nothing is stored."""
+        dates = self.dates(symbol, interval)
+        if start is not None: dates = [d for d in dates if d >= str(pd.Timestamp(start).date())]
+        if end is not None: dates = [d for d in dates if d <= str(pd.Timestamp(end).date())]
+        if days is not None: dates = dates[-days:]
+        if not dates: return None
+        folder = self._dir(symbol, interval)
+        tables = [self._read_table(os.path.join(folder, d + SUFFIX)) for d in dates]
+        return self._to_frame(pa.concat_tables(tables))
+
+    def write(self, symbol, df, interval="1m"):
+        """Merge bars into their session files. Returns the number of sessions touched."""
+        if df is None or df.empty: return 0
+        df = df[list(FIELDS)].astype(float)
+        index = df.index.tz_localize("UTC") if df.index.tz is None else df.index
+        sessions = index.tz_convert(self.tz).strftime("%Y-%m-%d")
+        folder = self._dir(symbol, interval)
+        with self._lock:
+            os.makedirs(folder, exist_ok=True)
+            for date, part in df.groupby(sessions):
+                path = os.path.join(folder, date + SUFFIX)
+                if os.path.exists(path):
+                    part = pd.concat([self._to_frame(self._read_table(path)), part])
+                    part = part[~part.index.duplicated(keep="last")].sort_index()
+                self._write_file(path, part)
+        return sessions.nunique()
+
+    def _write_file(self, path, df):
+        columns = {"time": pa.array(df.index.tz_convert("UTC"), SCHEMA.field("time").type)}
+        columns.update({f: pa.array(df[f].to_numpy(), pa.float64()) for f in FIELDS})
+        table = pa.table(columns, schema=SCHEMA)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, SCHEMA) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
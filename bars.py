@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from indicators import INDICATOR_COLUMNS, compute_panel
+from market_data import EXCHANGE_TZ
+
+FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+INDICATOR_CHUNK = 100  # symbols per compute_panel call
+
+
+def epoch_seconds(index):
+    """int64 UTC epoch seconds, whatever the index's datetime resolution."""
+    return np.asarray(index.tz_convert(None) if index.tz is not None else index, dtype="datetime64[s]").astype(np.int64)
+
+
+class BarSet:
+    """Compact OHLCV + indicators for many symbols (arrays shaped (bars, symbols)).
+
+    `time` is int64 epoch seconds (UTC); every column is one contiguous NumPy array, prices
+    optionally float32. Indicator columns are preallocated and filled in place by
+    compute_panel. Column access returns the stored arrays and row() returns views, so
+    score_frame reads the same memory without copies.
+    """
+
+    def __init__(self, time, columns, symbols=None):
+        self.time = time
+        self.columns = columns
+        self.symbols = symbols
+
+    @classmethod
+    def from_panel(cls, panel, symbols=None, dtype=np.float32):
+        """Many symbols from a get_panel() result ({field: DataFrame(time x symbol)})."""
+        symbols = list(panel['Close'].columns if symbols is None else symbols)
+        columns = {f: np.ascontiguousarray(panel[f][symbols].to_numpy(), dtype=dtype) for f in FIELDS}
+        return cls(epoch_seconds(panel['Close'].index), columns, symbols)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def shape(self):
+        return self.columns['Close'].shape
+
+    def sessions(self, tz=EXCHANGE_TZ):
+        """Trading-day label per bar (VWAP anchor)."""
+        return pd.to_datetime(self.time, unit="s", utc=True).tz_convert(tz).normalize().asi8
+
+    def compute_indicators(self, tz=EXCHANGE_TZ, chunk=INDICATOR_CHUNK):
+        """Fill the indicator columns (allocated once, in the price dtype) from the OHLCV.
+        Symbols are computed `chunk` at a time to bound the float64 scratch."""
+        dtype = self.columns['Close'].dtype
+        for name in INDICATOR_COLUMNS.values():
+            if name not in self.columns: self.columns[name] = np.empty(self.shape, dtype)
+        sessions = self.sessions(tz)
+        cols = self.columns
+        for j in range(0, self.shape[1], chunk):
+            block = np.s_[:, j:j + chunk]
+            compute_panel(cols['High'][block], cols['Low'][block], cols['Close'][block], cols['Volume'][block],
+                          sessions, out={name: cols[name][block] for name in INDICATOR_COLUMNS.values()})
+        return self
+
+    def row(self, i):
+        """{column: values at bar i}: one value per symbol (views into the 2D columns)."""
+        return {k: v[i] for k, v in self.columns.items()}
@@ -0,0 +1,240 @@
+import argparse
+import gc
+import itertools
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from alerts import AlertEngine
+from analysis import get_quant_analysis
+from bar_store import BarStore
+from bars import BarSet
+from chart import PayloadCache, last_chart_time
+from indicators import StreamingIndicators, compute_panel
+from market_data import EXCHANGE_TZ
+from scanner import scan
+from scoring import score_frame
+
+SESSION_BARS = 375  # 09:15-15:29 IST
+YEAR = 248          # NSE sessions per year
+TICKS = 100         # bars replayed by the per-tick cases
+DEFAULT_THRESHOLD = 0.25
+# changes below these are noise, never a regression
+MIN_SECONDS = 0.002
+MIN_PEAK_MB = 1.0
+
+
+# --- FIXTURES (deterministic, no network) ---
+def make_bars(days, symbols=1, seed=0, end="2026-01-30"):
+    """Random-walk 1m OHLCV over `days` NSE sessions: (index, {field: 2D array (bars x symbols)})."""
+    sessions = pd.bdate_range(end=end, periods=days)
+    minutes = pd.timedelta_range("9h15m", periods=SESSION_BARS, freq="1min")
+    index = pd.DatetimeIndex((sessions.values[:, None] + minutes.values).ravel()).tz_localize(EXCHANGE_TZ)
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 8e-4, (len(index), symbols)), axis=0))
+    open_ = np.vstack([close[:1], close[:-1]])
+    wick = np.abs(rng.normal(0, 4e-4, (2,) + close.shape))
+    return index, {
+        "Open": open_, "Close": close,
+        "High": np.fmax(open_, close) * (1 + wick[0]), "Low": np.fmin(open_, close) * (1 - wick[1]),
+        "Volume": rng.integers(100, 10000, close.shape).astype(float),
+    }
+
+
+def frames(index, panel):
+    """Per-symbol DataFrames (SYM000, SYM001, ...) from a make_bars panel."""
+    n = panel["Close"].shape[1]
+    return {f"SYM{j:03d}": pd.DataFrame({f: panel[f][:, j] for f in panel}, index=index) for j in range(n)}
+
+
+_FIXTURES = {}
+
+
+def fixture(days, symbols):
+    if (days, symbols) not in _FIXTURES: _FIXTURES[days, symbols] = make_bars(days, symbols)
+    return _FIXTURES[days, symbols]
+
+
+# --- CASES: setup() -> (zero-arg callable, bars processed per call) ---
+def _panel(days, symbols):
+    def setup():
+        index, p = fixture(days, symbols)
+        sessions = index.normalize().asi8
+        return lambda: compute_panel(p["High"], p["Low"], p["Close"], p["Volume"], sessions), len(index) * symbols
+    return setup
+
+
+def _scoring(days, symbols):
+    def setup():
+        index, p = fixture(days, symbols)
+        flat = {k: v.ravel() for k, v in compute_panel(p["High"], p["Low"], p["Close"], p["Volume"],
+                                                         index.normalize().asi8).items()}
+        flat["Close"] = p["Close"].ravel()
+        return lambda: score_frame(flat), len(index) * symbols
+    return setup
+
+
+def _barset(days, symbols):
+    def setup():
+        index, p = fixture(days, symbols)
+        panel = {f: pd.DataFrame(p[f], index=index) for f in p}
+        return lambda: BarSet.from_panel(panel).compute_indicators(), len(index) * symbols
+    return setup
+
+
+def _stream_cold(days):
+    def setup():
+        df = frames(*fixture(days, 1))["SYM000"]
+        return lambda: StreamingIndicators().sync(df), len(df)
+    return setup
+
+
+def _stream_tick(days):
+    def setup():
+        df = frames(*fixture(days, 1))["SYM000"]
+        engine = StreamingIndicators()
+        engine.sync(df.iloc[:-TICKS])
+        views = [df.iloc[:len(df) - TICKS + i + 1] for i in range(TICKS)]
+        return lambda: [engine.sync(v) for v in views], TICKS
+    return setup
+
+
+_keys = itertools.count()
+
+
+def _analysis_tick(days):
+    def setup():
+        df = frames(*fixture(days, 1))["SYM000"]
+        key = f"BENCH{next(_keys)}"  # fresh streaming engine per run
+        get_quant_analysis(key, df.iloc[:-TICKS], (0.5, "IT"))
+        views = [df.iloc[:len(df) - TICKS + i + 1] for i in range(TICKS)]
+        return lambda: [get_quant_analysis(key, v, (0.5, "IT")) for v in views], TICKS
+    return setup
+
+
+def _chart(days, feed=False):
+    def setup():
+        df = frames(*fixture(days, 1))["SYM000"]
+        since = last_chart_time(df) - 30 * 60 if feed else None
+        cache = PayloadCache()  # cold: every call serializes
+        return lambda: cache.get("SYM000", df, since), 31 if feed else len(df)
+    return setup
+
+
+def _scan(days, symbols, root):
+    def setup():
+        store = BarStore(root, tz=EXCHANGE_TZ)
+        if not store.symbols():
+            for name, df in frames(*fixture(days, symbols)).items(): store.write(name, df)
+        names = store.symbols()
+        return lambda: scan(names, period=f"{days}d", offline=True, store=store), days * SESSION_BARS * len(names)
+    return setup
+
+
+def _alerts(symbols):
+    def setup():
+        index, p = fixture(5, symbols)
+        ind = compute_panel(p["High"], p["Low"], p["Close"], p["Volume"], index.normalize().asi8)
+        score, signal = score_frame({**{k: v[-2:].ravel() for k, v in ind.items()}, "Close": p["Close"][-2:].ravel()})
+        rows = [{f"SYM{j:03d}": {**{k: v[t, j] for k, v in ind.items()}, "Close": p["Close"][t, j],
+                                 "Volume": p["Volume"][t, j], "Score": score[i * symbols + j],
+                                 "Signal": signal[i * symbols + j], "bar_ts": t} for j in range(symbols)}
+                for i, t in enumerate((-2, -1))]
+        engine = AlertEngine(debounce=0)
+        engine.evaluate(rows[0])
+        return lambda: engine.evaluate(rows[1]), symbols
+    return setup
+
+
+def cases(tmp):
+    return {
+        "indicators.panel 5d x1": _panel(5, 1),
+        "indicators.panel 5d x10": _panel(5, 10),
+        "indicators.panel 5d x200": _panel(5, 200),
+        "indicators.panel 1y x1": _panel(YEAR, 1),
+        "indicators.panel 1y x10": _panel(YEAR, 10),
+        "barset float32 5d x500": _barset(5, 500),
+        "indicators.stream cold 5d": _stream_cold(5),
+        "indicators.stream tick": _stream_tick(5),
+        "scoring 5d x200": _scoring(5, 200),
+        "scoring 1y x10": _scoring(YEAR, 10),
+        "analysis tick": _analysis_tick(5),
+        "alerts 200 symbols": _alerts(200),
+        "chart.payload 5d": _chart(5),
+        "chart.payload 1y": _chart(YEAR),
+        "chart.feed 30m": _chart(5, feed=True),
+        "scan offline 5d x10": _scan(5, 10, f"{tmp}/x10"),
+        "scan offline 5d x200": _scan(5, 200, f"{tmp}/x200"),
+    }
+
+
+# --- RUNNER ---
+def measure(setup, repeat):
+    """Best-of-`repeat` wall time, then one extra run under tracemalloc for peak memory."""
+    fn, bars = setup()
+    fn()  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        fn, _ = setup()
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    fn, _ = setup()
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": best, "bars_per_s": bars / best, "peak_mb": peak / 2**20}
+
+
+def regressions(results, baseline, threshold):
+    """Cases whose time or peak memory grew by more than `threshold` over the baseline."""
+    failed = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None: continue
+        for metric, floor in (("seconds", MIN_SECONDS), ("peak_mb", MIN_PEAK_MB)):
+            if r[metric] > base[metric] * (1 + threshold) and r[metric] - base[metric] > floor:
+                failed.append(f"{name}: {metric} {base[metric]:.4g} -> {r[metric]:.4g} "
+                              f"(+{100 * (r[metric] / base[metric] - 1):.0f}%)")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the indicator, scoring, chart and scan "
+                                                 "hot paths on deterministic synthetic 1m bars.")
+    parser.add_argument("-k", dest="select", help="only cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", help="JSON from --save; exit 1 if any case regressed past --threshold")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed growth, 0.25 = 25%%")
+    parser.add_argument("--save", metavar="PATH", help="write results as a baseline JSON")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, setup in cases(tmp).items():
+            if args.select and args.select not in name: continue
+            results[name] = measure(setup, args.repeat)
+            r = results[name]
+            print(f"{name:<28} {1e3 * r['seconds']:>10.2f} ms {r['bars_per_s']:>14,.0f} bars/s "
+                  f"{r['peak_mb']:>9.1f} MB", flush=True)
+
+    if args.save:
+        with open(args.save, "w") as f: json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f: failed = regressions(results, json.load(f), args.threshold)
+        if failed:
+            print("\nREGRESSED:\n  " + "\n  ".join(failed))
+            sys.exit(1)
+        print(f"\nNo regressions beyond {100 * args.threshold:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
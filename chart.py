@@ -0,0 +1,59 @@
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from bars import epoch_seconds
+from market_data import IST_OFFSET  # lightweight-charts has no timezone support: times are shifted to IST wall time
+from metrics import incr, span
+
+PAYLOAD_CACHE_SIZE = 64
+
+
+def candle_columns(df, since=None):
+    """Columnar candles {time, open, high, low, close} built straight from the OHLC arrays.
+    `since` (chart time) keeps only candles at or after it."""
+    times = epoch_seconds(df.index) + IST_OFFSET
+    start = 0 if since is None else int(np.searchsorted(times, since))
+    return {"time": times[start:].tolist(),
+            **{f.lower(): df[f].to_numpy(dtype=float)[start:].tolist() for f in ('Open', 'High', 'Low', 'Close')}}
+
+
+class PayloadCache:
+    """Serialized chart payloads keyed by symbol + bar range + the (still-forming) last candle."""
+
+    def __init__(self, maxsize=PAYLOAD_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, symbol, df, since=None):
+        last = df.iloc[-1]
+        key = (symbol, since, df.index[0], df.index[-1],
+               float(last['Open']), float(last['High']), float(last['Low']), float(last['Close']))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                incr("cache.chart.hit")
+                return self._entries[key]
+        incr("cache.chart.miss")
+        with span("render.chart_payload"):
+            payload = json.dumps(candle_columns(df, since), separators=(",", ":"))
+        with self._lock:
+            self._entries[key] = payload
+            while len(self._entries) > self.maxsize: self._entries.popitem(last=False)
+        return payload
+
+
+PAYLOAD_CACHE = PayloadCache()
+
+
+def chart_payload(symbol, df, since=None):
+    """JSON candle payload for symbol (shared across sessions)."""
+    if df is None or df.empty: return None
+    return PAYLOAD_CACHE.get(symbol, df, since)
+
+
+def last_chart_time(df):
+    return int(epoch_seconds(df.index[-1:])[0] + IST_OFFSET)
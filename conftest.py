@@ -0,0 +1 @@
+# Lets pytest import the top-level modules (indicators, scoring, ...) from tests/
@@ -0,0 +1,52 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from metrics import incr
+
+FETCH_WORKERS = 16
+
+# Seconds each source may take before the dashboard renders without it.
+TIMEOUTS = {
+    "bars": 8,
+    "sector": 5,
+    "quotes": 5,
+    "news": 4,
+    "market_news": 4,
+}
+DEFAULT_TIMEOUT = 8
+
+FETCH_POOL = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch")
+
+log = logging.getLogger(__name__)
+
+
+def fetch_concurrently(sources, timeouts=None, pool=None):
+    """Run {name: zero-arg callable} concurrently and yield (name, result) as each one finishes.
+
+    A source that raises, or is still running when its timeout expires, yields (name, None)
+    so the caller can render without it; the worker thread is left to finish on its own.
+    Failures are logged and counted as errors.<name> / timeouts.<name>.
+    """
+    timeouts = {**TIMEOUTS, **(timeouts or {})}
+    pool = pool or FETCH_POOL
+    start = time.monotonic()
+    pending = {pool.submit(fn): name for name, fn in sources.items()}
+    deadlines = {f: start + timeouts.get(name, DEFAULT_TIMEOUT) for f, name in pending.items()}
+    while pending:
+        wait_for = max(0, min(deadlines[f] for f in pending) - time.monotonic())
+        done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            try: result = future.result()
+            except Exception:
+                incr(f"errors.{name}")
+                log.warning("%s fetch failed", name, exc_info=True)
+                result = None
+            yield name, result
+        now = time.monotonic()
+        for future in [f for f in pending if deadlines[f] <= now]:
+            name = pending.pop(future)
+            incr(f"timeouts.{name}")
+            log.warning("%s fetch timed out after %ss", name, timeouts.get(name, DEFAULT_TIMEOUT))
+            yield name, None
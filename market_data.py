@@ -0,0 +1,387 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import yfinance as yf
+
+from bar_store import BarStore
+from metrics import incr, span
+
+BAR_TTL = 10          # seconds, matches the dashboard refresh interval
+BAR_CACHE_SIZE = 256  # (symbol, interval, period) entries kept before LRU eviction
+INTRADAY_DAYS = 5     # trading sessions of 1m bars kept per symbol
+EXCHANGE_TZ = "Asia/Kolkata"
+IST_OFFSET = 19800       # seconds east of UTC (IST has no DST)
+SESSION_OPEN = 9 * 60 + 15   # NSE cash session, minutes after local midnight
+SESSION_CLOSE = 15 * 60 + 30
+DATA_DIR = os.environ.get("MM_DATA_DIR", "data")
+RESUME_LIMIT = pd.Timedelta(days=6)  # Yahoo only serves ~7 days of 1m bars after a `start`
+OPEN_GRACE = 5  # minutes after the open a stored session may start and still count as whole (thin symbols skip bars)
+
+log = logging.getLogger(__name__)
+
+# Every Yahoo request (bars, panels, index quotes) goes through this; tests swap in a
+# local stand-in with the same signature
+DOWNLOAD = yf.download
+
+
+SECTOR_MAP = {
+    "RELIANCE": "^CNXENERGY", "ONGC": "^CNXENERGY", "POWERGRID": "^CNXENERGY",
+    "TCS": "^CNXIT", "INFY": "^CNXIT", "WIPRO": "^CNXIT", "HCLTECH": "^CNXIT",
+    "HDFCBANK": "^NSEBANK", "SBIN": "^NSEBANK", "ICICIBANK": "^NSEBANK",
+    "TATASTEEL": "^CNXMETAL", "JINDALSTEL": "^CNXMETAL",
+    "TATAMOTORS": "^CNXAUTO", "M&M": "^CNXAUTO", "TMCV": "^CNXAUTO",
+    "ITC": "^CNXFMCG", "HUL": "^CNXFMCG", "SUNPHARMA": "^CNXPHARMA",
+    "BSE": "^CNXFIN", "CDSL": "^CNXFIN", "ZOMATO": "^CNXIT"
+}
+
+INDEX_NAMES = {
+    "^NSEI": "NIFTY 50", "^NSEBANK": "NIFTY BANK", "^CNXENERGY": "ENERGY", "^CNXIT": "IT",
+    "^CNXMETAL": "METAL", "^CNXAUTO": "AUTO", "^CNXFMCG": "FMCG", "^CNXPHARMA": "PHARMA", "^CNXFIN": "FIN",
+}
+# Everything the header and sector scoring need, fetched as one batch.
+INDEX_SYMBOLS = sorted({"^NSEI", "^NSEBANK", *SECTOR_MAP.values()})
+
+
+def clean_ticker(ticker):
+    return ticker.replace(".NS", "").replace(".BO", "").upper()
+
+
+def get_sector_map(ticker):
+    """Maps Stock to Sector Index"""
+    return SECTOR_MAP.get(clean_ticker(ticker), "^NSEI")
+
+
+def to_yf_symbol(ticker):
+    """RELIANCE -> RELIANCE.NS (index symbols like ^NSEI pass through)"""
+    if ticker.startswith("^") or ".NS" in ticker or ".BO" in ticker: return ticker
+    return f"{ticker}.NS"
+
+
+def _clean(df):
+    if df is None or df.empty: return None
+    with span("clean"):
+        if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
+        # --- FIX FOR VWAP ERROR: Force Sort Index ---
+        df = df.dropna().sort_index()
+    return df if not df.empty else None
+
+
+def download_bars(symbol, interval, period):
+    """Single yfinance download, flattened + cleaned. None when Yahoo returns nothing."""
+    with span("fetch.download"):
+        raw = DOWNLOAD(symbol, period=period, interval=interval, progress=False)
+    return _clean(raw)
+
+
+def download_bars_since(symbol, start, interval="1m"):
+    """Bars from `start` (inclusive) to now."""
+    with span("fetch.download_since"):
+        raw = DOWNLOAD(symbol, start=start, interval=interval, progress=False)
+    return _clean(raw)
+
+
+def download_frames(symbols, interval="1m", period=None, start=None):
+    """One yf.download for many symbols (a `period` or bars from `start`) -> {symbol: cleaned
+    OHLCV frame}; symbols Yahoo returned nothing for are left out."""
+    window = {"period": period} if start is None else {"start": start}
+    with span("fetch.download_frames"):
+        raw = DOWNLOAD(" ".join(symbols), interval=interval, group_by="column", progress=False, **window)
+    if raw is None or raw.empty: return {}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        raw.columns = pd.MultiIndex.from_product([raw.columns, symbols])
+    frames = {s: _clean(raw.xs(s, axis=1, level=1)[['Open', 'High', 'Low', 'Close', 'Volume']])
+              for s in raw.columns.get_level_values(1).unique()}
+    return {s: df for s, df in frames.items() if df is not None}
+
+
+def _trim_sessions(df, days):
+    """Keep only the last `days` trading dates (index is exchange-local)."""
+    dates = df.index.normalize()
+    sessions = dates.unique()
+    if len(sessions) <= days: return df
+    return df[dates >= sessions[-days]]
+
+
+BAR_STORE = BarStore(DATA_DIR, tz=EXCHANGE_TZ)
+
+
+class IntradayBarStore:
+    """Incremental per-symbol 1m history.
+
+    The first refresh of a symbol starts from the on-disk store when it holds recent bars,
+    otherwise it loads the full window; later refreshes only download bars from the last
+    stored timestamp on, which replaces the still-forming last candle and appends anything
+    newer. Downloaded bars are appended to the on-disk store. Bars older than the last `days`
+    sessions are dropped from memory. Each refresh builds a new frame, so frames already
+    handed out never change. refresh_many() does the same for a whole list in two batched
+    downloads (the scanner).
+    """
+
+    def __init__(self, days=INTRADAY_DAYS, maxsize=BAR_CACHE_SIZE,
+                 full_loader=download_bars, since_loader=download_bars_since, batch_loader=download_frames,
+                 store=None):
+        self.days = days
+        self.maxsize = maxsize
+        self.full_loader = full_loader
+        self.since_loader = since_loader
+        self.batch_loader = batch_loader
+        self.store = store
+        self._frames = OrderedDict()  # symbol -> DataFrame
+        self._checked = {}            # symbol -> monotonic time of its last refresh
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._batch_lock = threading.Lock()
+
+    def _symbol_lock(self, symbol):
+        with self._lock:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def get(self, symbol):
+        with self._lock:
+            return self._frames.get(symbol)
+
+    def _stored(self, symbol):
+        """Last `days` sessions from disk, if they are all there (a store first filled mid-session
+        or holding fewer sessions is not, and is backfilled by a full load) and recent enough
+        to resume incrementally."""
+        if self.store is None: return None
+        with span("store.read"):
+            df = self.store.read(clean_ticker(symbol), "1m", days=self.days)
+        if df is None or pd.Timestamp.now(tz=df.index.tz) - df.index[-1] > RESUME_LIMIT: return None
+        first = df.index[0]
+        if df.index.normalize().nunique() < self.days or first.hour * 60 + first.minute > SESSION_OPEN + OPEN_GRACE:
+            incr("store.incomplete")
+            return None
+        return df
+
+    def _persist(self, symbol, df):
+        if self.store is None: return
+        try:
+            with span("store.write"): self.store.write(clean_ticker(symbol), df, "1m")
+        except OSError:  # a read-only or full disk must not stop live data
+            incr("errors.store")
+            log.warning("bar store write failed for %s", symbol, exc_info=True)
+
+    def _merge(self, symbol, df, new):
+        """df with the downloaded bars `new` (from its last bar on) replacing its tail."""
+        if new is None: return df
+        self._persist(symbol, new)
+        df = pd.concat([df[df.index < new.index[0]], new])
+        return _trim_sessions(df[~df.index.duplicated(keep="last")], self.days)
+
+    def _put(self, symbol, df):
+        with self._lock:
+            self._frames[symbol] = df
+            self._frames.move_to_end(symbol)
+            self._checked[symbol] = time.monotonic()
+            while len(self._frames) > self.maxsize:
+                evicted, _ = self._frames.popitem(last=False)
+                self._locks.pop(evicted, None)
+                self._checked.pop(evicted, None)
+
+    def refresh(self, symbol):
+        with self._symbol_lock(symbol):
+            df = self.get(symbol)
+            if df is None: df = self._stored(symbol)
+            if df is None:
+                df = self.full_loader(symbol, "1m", f"{self.days}d")
+                if df is None: return None
+                self._persist(symbol, df)
+            else:
+                df = self._merge(symbol, df, self.since_loader(symbol, df.index[-1]))
+            self._put(symbol, df)
+            return df
+
+    def refresh_many(self, symbols, ttl=BAR_TTL):
+        """{symbol: frame} for many symbols. Frames refreshed within `ttl` (by anyone) are
+        reused; the other held or stored ones are brought up to date by one download from
+        the oldest of their last bars, and symbols with neither by one full-window download."""
+        with self._batch_lock:
+            now = time.monotonic()
+            with self._lock:
+                held = {s: self._frames.get(s) for s in symbols}
+                out = {s: df for s, df in held.items() if df is not None and now - self._checked[s] < ttl}
+            stale = [s for s in symbols if s not in out]
+            resume = {s: held[s] if held[s] is not None else self._stored(s) for s in stale}
+            resume = {s: df for s, df in resume.items() if df is not None}
+            cold = [s for s in stale if s not in resume]
+            new = self.batch_loader(list(resume), start=min(df.index[-1] for df in resume.values())) if resume else {}
+            full = self.batch_loader(cold, period=f"{self.days}d") if cold else {}
+            for s, df in resume.items():
+                out[s] = self._merge(s, df, new.get(s))
+                self._put(s, out[s])
+            for s, df in full.items():
+                self._persist(s, df)
+                self._put(s, df)
+                out[s] = df
+            return out
+
+
+def download_panel(symbols, interval, period):
+    """One yf.download for many symbols -> {field: DataFrame(time x symbol)}.
+
+    `symbols` is a space-separated string so the call can go through a BarCache.
+    Gaps are forward-filled (volume 0) so every symbol shares one time axis.
+    """
+    with span("fetch.download_panel"):
+        raw = DOWNLOAD(symbols, period=period, interval=interval, group_by="column", progress=False)
+    if raw is None or raw.empty: return None
+    if not isinstance(raw.columns, pd.MultiIndex):
+        raw.columns = pd.MultiIndex.from_product([raw.columns, symbols.split()])
+    raw = raw.dropna(how="all").sort_index()
+    panel = {f: raw[f] for f in ('Open', 'High', 'Low', 'Close')}
+    panel = {f: p.ffill() for f, p in panel.items()}
+    panel['Volume'] = raw['Volume'].fillna(0)
+    return panel
+
+
+class _Call:
+    """One in-flight load that concurrent callers of the same key wait on."""
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BarCache:
+    """Process-wide TTL + LRU cache of OHLCV frames keyed by (symbol, interval, period).
+
+    Every Streamlit session imports the same module object, so one instance is shared
+    by all sessions. Concurrent misses on the same key collapse into a single load.
+    Cached frames are shared: callers must copy before mutating.
+    """
+
+    def __init__(self, loader, ttl=BAR_TTL, maxsize=BAR_CACHE_SIZE, name="bars"):
+        self.loader = loader
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (expires_at, frame)
+        self._inflight = {}            # key -> _Call
+        self._lock = threading.Lock()
+
+    def get(self, symbol, interval="1m", period="5d"):
+        key = (symbol, interval, period)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                incr(f"cache.{self.name}.hit")
+                return entry[1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader: call = self._inflight[key] = _Call()
+        incr(f"cache.{self.name}.{'miss' if leader else 'shared'}")
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None: raise call.error
+            return call.result
+
+        try:
+            with span(f"fetch.{self.name}"): call.result = self.loader(symbol, interval, period)
+        except Exception as e:
+            incr(f"errors.{self.name}")
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if call.error is None:
+                    self._entries[key] = (time.monotonic() + self.ttl, call.result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.maxsize: self._entries.popitem(last=False)
+                del self._inflight[key]
+            call.event.set()
+        return call.result
+
+
+INTRADAY_STORE = IntradayBarStore(store=BAR_STORE)
+
+
+def load_bars(symbol, interval, period):
+    """BarCache loader: the default 1m window goes through the incremental store."""
+    if interval == "1m" and period == f"{INTRADAY_STORE.days}d": return INTRADAY_STORE.refresh(symbol)
+    return download_bars(symbol, interval, period)
+
+
+BAR_CACHE = BarCache(load_bars)
+PANEL_CACHE = BarCache(download_panel, maxsize=16, name="panel")
+
+
+def get_bars(ticker, interval="1m", period="5d"):
+    """Cached OHLCV for a stock or index symbol (shared, do not mutate)."""
+    return BAR_CACHE.get(to_yf_symbol(ticker), interval, period)
+
+
+def get_panel(tickers, interval="1m", period="5d"):
+    """Cached multi-symbol OHLCV panel from a single download (shared, do not mutate)."""
+    symbols = " ".join(sorted({to_yf_symbol(t) for t in tickers}))
+    return PANEL_CACHE.get(symbols, interval, period)
+
+
+def get_stored_bars(ticker, interval="1m", days=None, store=None):
+    """OHLCV from the on-disk store only (no network): the last `days` stored sessions, or all."""
+    return (store or BAR_STORE).read(clean_ticker(ticker), interval, days=days)
+
+
+def frames_to_panel(frames):
+    """{symbol: OHLCV frame} -> get_panel-style {field: DataFrame(time x symbol)} on the union
+    of their bars (prices forward-filled, volume 0 where a symbol has no bar)."""
+    frames = {s: df for s, df in frames.items() if df is not None}
+    if not frames: return None
+    raw = pd.concat(frames, axis=1).sort_index()
+    panel = {f: raw.xs(f, axis=1, level=1).ffill() for f in ('Open', 'High', 'Low', 'Close')}
+    panel['Volume'] = raw.xs('Volume', axis=1, level=1).fillna(0)
+    return panel
+
+
+def get_live_panel(tickers):
+    """Panel of the live 1m window for many tickers, refreshed incrementally through
+    INTRADAY_STORE (shared with the per-symbol bars, at most one update per BAR_TTL)."""
+    return frames_to_panel(INTRADAY_STORE.refresh_many(sorted({to_yf_symbol(t) for t in tickers})))
+
+
+def get_stored_panel(tickers, interval="1m", days=INTRADAY_DAYS, store=None):
+    """Offline counterpart of get_live_panel, assembled from the on-disk store (default BAR_STORE)."""
+    return frames_to_panel({to_yf_symbol(t): get_stored_bars(t, interval, days, store) for t in tickers})
+
+
+def index_name(symbol):
+    return INDEX_NAMES.get(symbol, symbol.lstrip("^"))
+
+
+def get_index_quotes():
+    """Quote snapshot for NIFTY 50, NIFTY BANK and every sector index from one batched daily
+    download, cached for BAR_TTL and shared by all symbols and sessions.
+    DataFrame indexed by symbol: Name, Price, Change, Chg % (vs previous close), Day % (vs open)."""
+    panel = get_panel(INDEX_SYMBOLS, "1d", "5d")
+    if panel is None or len(panel['Close']) < 2: return None
+    close, prev, day_open = panel['Close'].iloc[-1], panel['Close'].iloc[-2], panel['Open'].iloc[-1]
+    quotes = pd.DataFrame({
+        "Name": [index_name(s) for s in close.index],
+        "Price": close, "Change": close - prev,
+        "Chg %": (close - prev) / prev * 100, "Day %": (close - day_open) / day_open * 100,
+    }).dropna(subset=["Price"])
+    return quotes if not quotes.empty else None
+
+
+def get_market_indices(quotes=None):
+    """NIFTY 50 and NIFTY BANK as ({price, change, pct}, {...}); None for a missing index."""
+    quotes = get_index_quotes() if quotes is None else quotes
+    def pick(symbol):
+        if quotes is None or symbol not in quotes.index: return None
+        q = quotes.loc[symbol]
+        return {"price": q["Price"], "change": q["Change"], "pct": q["Chg %"]}
+    return pick("^NSEI"), pick("^NSEBANK")
+
+
+def sector_heatmap(quotes=None):
+    """Sector indices from the quote snapshot, strongest day first."""
+    quotes = get_index_quotes() if quotes is None else quotes
+    if quotes is None: return None
+    sectors = quotes.drop(index=["^NSEI"], errors="ignore")
+    return sectors.sort_values("Day %", ascending=False)
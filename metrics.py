@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = os.environ.get("MM_METRICS_PORT")  # when set, serve /metrics and /metrics.json on localhost
+METRICS_LOG = os.environ.get("MM_METRICS_LOG")    # when set, append one JSON snapshot per refresh cycle
+
+
+class Metrics:
+    """Process-wide timing spans and event counters.
+
+    Span names are dotted stages ("fetch.bars", "indicators.rsi", "render.header"); counters
+    follow "cache.<name>.hit|miss", "errors.<source>", "timeouts.<source>".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}     # name -> [count, total s, max s, last s]
+        self._counters = {}  # name -> int
+
+    def observe(self, name, seconds):
+        with self._lock:
+            s = self._spans.get(name)
+            if s is None: self._spans[name] = [1, seconds, seconds, seconds]
+            else: s[0], s[1], s[2], s[3] = s[0] + 1, s[1] + seconds, max(s[2], seconds), seconds
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try: yield
+        finally: self.observe(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name): return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def stopwatch(self, prefix):
+        """lap(name) records the time since the previous lap as <prefix>.<name>; for
+        timing consecutive stages of one function without nesting `with` blocks."""
+        last = [time.perf_counter()]
+        def lap(name):
+            now = time.perf_counter()
+            self.observe(f"{prefix}.{name}", now - last[0])
+            last[0] = now
+        return lap
+
+    def snapshot(self):
+        with self._lock:
+            spans = {name: {"count": c, "total_ms": 1e3 * t, "avg_ms": 1e3 * t / c, "max_ms": 1e3 * m,
+                            "last_ms": 1e3 * l} for name, (c, t, m, l) in sorted(self._spans.items())}
+            return {"time": time.time(), "spans": spans, "counters": dict(sorted(self._counters.items()))}
+
+    def prometheus(self):
+        snap = self.snapshot()
+        lines = ["# TYPE mm_span_seconds summary"]
+        for name, s in snap["spans"].items():
+            lines.append(f'mm_span_seconds_count{{span="{name}"}} {s["count"]}')
+            lines.append(f'mm_span_seconds_sum{{span="{name}"}} {s["total_ms"] / 1e3:.6f}')
+        lines.append("# TYPE mm_span_seconds_max gauge")
+        lines += [f'mm_span_seconds_max{{span="{name}"}} {s["max_ms"] / 1e3:.6f}' for name, s in snap["spans"].items()]
+        lines.append("# TYPE mm_events_total counter")
+        lines += [f'mm_events_total{{name="{name}"}} {n}' for name, n in snap["counters"].items()]
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+
+METRICS = Metrics()
+span, timed, incr, stopwatch = METRICS.span, METRICS.timed, METRICS.incr, METRICS.stopwatch
+
+
+def log_snapshot(path=METRICS_LOG):
+    """Append the current snapshot as one JSON line (no-op without a path)."""
+    if not path: return
+    with open(path, "a") as f: f.write(json.dumps(METRICS.snapshot()) + "\n")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics": body, kind = METRICS.prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json": body, kind = json.dumps(METRICS.snapshot()), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", kind)
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args): pass
+
+
+_SERVER = None
+_SERVER_LOCK = threading.Lock()
+
+
+def serve(port=METRICS_PORT, host="127.0.0.1"):
+    """Start the metrics endpoint once per process (no-op without a port)."""
+    global _SERVER
+    if not port: return None
+    with _SERVER_LOCK:
+        if _SERVER is None:
+            _SERVER = ThreadingHTTPServer((host, int(port)), _Handler)
+            threading.Thread(target=_SERVER.serve_forever, name="metrics-http", daemon=True).start()
+        return _SERVER
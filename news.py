@@ -0,0 +1,118 @@
+import calendar
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import feedparser
+
+from fetchers import TIMEOUTS
+from metrics import incr, span
+
+# Overridable so a local stand-in feed can be used in tests
+NEWS_URL = os.environ.get("MM_NEWS_URL", "https://news.google.com/rss/search")
+NEWS_TTL = 60   # seconds a parsed feed is served before it is revalidated
+NEWS_ITEMS = 6
+
+
+def time_ago(published, now=None):
+    """'5m ago' style age of an epoch timestamp (None -> 'Just now')."""
+    if not published: return "Just now"
+    seconds = (now or time.time()) - published
+    if seconds < 60: return "Just now"
+    if seconds < 3600: return f"{int(seconds // 60)}m ago"
+    if seconds < 86400: return f"{int(seconds // 3600)}h ago"
+    return f"{int(seconds // 86400)}d ago"
+
+
+def _title_key(title):
+    """Google News appends ' - Source' to titles; syndicated copies differ only there."""
+    return re.sub(r"\W+", " ", title.rsplit(" - ", 1)[0]).strip().lower()
+
+
+def dedupe(*feeds):
+    """Drop stories (same link or same headline) already seen in this or an earlier feed."""
+    seen, out = set(), []
+    for items in feeds:
+        kept = []
+        for item in items or ():
+            keys = {item['link'], _title_key(item['title'])}
+            if keys & seen: continue
+            seen |= keys
+            kept.append(item)
+        out.append(kept)
+    return out
+
+
+def parse_feed(body, limit=NEWS_ITEMS):
+    """RSS bytes -> [{title, link, source, published (epoch s or None)}], newest first, deduped."""
+    items = []
+    for entry in feedparser.parse(body).entries:
+        parsed = entry.get("published_parsed")
+        items.append({
+            "title": entry.get("title", ""),
+            "link": entry.get("link", ""),
+            "source": entry.get("source", {}).get("title", ""),
+            "published": calendar.timegm(parsed) if parsed else None,  # feedparser structs are UTC
+        })
+    items.sort(key=lambda item: item['published'] or 0, reverse=True)
+    return dedupe(items)[0][:limit]
+
+
+class NewsService:
+    """Per-query feed cache.
+
+    A feed younger than `ttl` is served from memory. After that it is revalidated with
+    If-None-Match / If-Modified-Since, so an unchanged feed costs a 304 and no parsing.
+    A failed refresh keeps serving the last good items; with nothing cached it raises.
+    """
+
+    def __init__(self, url=NEWS_URL, ttl=NEWS_TTL, limit=NEWS_ITEMS):
+        self.url = url
+        self.ttl = ttl
+        self.limit = limit
+        self._entries = {}  # query -> {"items", "etag", "modified", "checked"}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _query_lock(self, query):
+        with self._lock:
+            return self._locks.setdefault(query, threading.Lock())
+
+    def _request(self, query, entry):
+        params = urllib.parse.urlencode({"q": query, "hl": "en-IN", "gl": "IN", "ceid": "IN:en"})
+        request = urllib.request.Request(f"{self.url}?{params}")
+        if entry.get("etag"): request.add_header("If-None-Match", entry["etag"])
+        if entry.get("modified"): request.add_header("If-Modified-Since", entry["modified"])
+        return request
+
+    def get(self, query, timeout=TIMEOUTS["news"]):
+        with self._query_lock(query):
+            entry = self._entries.get(query, {})
+            if entry and time.monotonic() - entry["checked"] < self.ttl:
+                incr("cache.news.hit")
+                return entry["items"]
+            try:
+                with span("news"), urllib.request.urlopen(self._request(query, entry), timeout=timeout) as resp:
+                    entry = {"items": parse_feed(resp.read(), self.limit),
+                             "etag": resp.headers.get("ETag"), "modified": resp.headers.get("Last-Modified")}
+                incr("cache.news.miss")
+            except Exception as e:
+                if not entry: raise
+                # 304: unchanged; anything else (429, 5xx, timeout): keep serving the last good items
+                if isinstance(e, urllib.error.HTTPError) and e.code == 304: incr("cache.news.not_modified")
+                else: incr("errors.news")
+            entry["checked"] = time.monotonic()
+            self._entries[query] = entry
+            return entry["items"]
+
+
+NEWS = NewsService()
+
+
+def fetch_news(query, timeout=TIMEOUTS["news"]):
+    """Latest stories for query (cached, conditional fetch)."""
+    return NEWS.get(query, timeout)
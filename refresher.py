@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from alerts import AlertEngine, default_sinks
+from analysis import get_quant_analysis, get_sector_strength
+from fetchers import fetch_concurrently
+from market_data import BAR_TTL, get_bars, get_index_quotes, get_market_indices, sector_heatmap
+from metrics import incr, log_snapshot, serve, span
+from news import NEWS_TTL, fetch_news
+
+REFRESH_INTERVAL = BAR_TTL  # seconds between refresh cycles
+NEWS_INTERVAL = NEWS_TTL    # news changes far less often than prices
+SESSION_IDLE = 60           # drop a session's watchlist after this long without a heartbeat
+MARKET_QUERY = "Indian Stock Market"
+
+log = logging.getLogger(__name__)
+
+
+class Refresher(threading.Thread):
+    """Single background poller shared by every browser session.
+
+    Sessions register their watchlist with `watch()` on each rerun. Every cycle the thread
+    refreshes the union of live watchlists and publishes one snapshot per symbol (analysis,
+    1m bars, last bar time, news) plus a market snapshot (index quotes, sector heatmap, market news),
+    then runs the alert engine over every refreshed symbol. Fragments only read
+    snapshots, so upstream traffic scales with symbols, not with open tabs.
+    """
+
+    def __init__(self, interval=REFRESH_INTERVAL, news_interval=NEWS_INTERVAL, idle=SESSION_IDLE, workers=8,
+                 alerts=None):
+        super().__init__(name="market-refresher", daemon=True)
+        self.alerts = alerts or AlertEngine(sinks=default_sinks())
+        self.interval = interval
+        self.news_interval = news_interval
+        self.idle = idle
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="refresh")
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sessions = {}   # session id -> (symbols, last heartbeat)
+        self._snapshots = {}  # symbol -> dict
+        self._published = {}  # symbol -> threading.Event, set once the first price snapshot exists
+        self.market = {}
+
+    # --- session side ---
+    def watch(self, session_id, symbols):
+        symbols = tuple(symbols)
+        with self._lock:
+            new = set(symbols) - self._symbols_locked()
+            self._sessions[session_id] = (symbols, time.monotonic())
+            for symbol in symbols: self._published.setdefault(symbol, threading.Event())
+        if new: self._wake.set()
+
+    def snapshot(self, symbol, wait=0):
+        """Latest published snapshot for symbol; optionally wait for the first one."""
+        with self._lock:
+            ready = self._published.setdefault(symbol, threading.Event())
+        if wait and not ready.is_set():
+            self._wake.set()
+            ready.wait(wait)
+        with self._lock:
+            return self._snapshots.get(symbol)
+
+    # --- refresher side ---
+    def _symbols_locked(self):
+        return {s for symbols, _ in self._sessions.values() for s in symbols}
+
+    def symbols(self):
+        with self._lock:
+            cutoff = time.monotonic() - self.idle
+            self._sessions = {k: v for k, v in self._sessions.items() if v[1] >= cutoff}
+            return self._symbols_locked()
+
+    def _publish(self, symbol, ready=True, **fields):
+        with self._lock:
+            self._snapshots[symbol] = {**self._snapshots.get(symbol, {}), **fields, "updated": time.time()}
+            if ready: self._published.setdefault(symbol, threading.Event()).set()
+
+    def _news_due(self, snap):
+        return snap is None or time.time() - snap.get("news_at", 0) >= self.news_interval
+
+    def refresh_symbol(self, symbol):
+        with self._lock:
+            snap = self._snapshots.get(symbol)
+        sources = {"bars": lambda: get_bars(symbol, "1m", "5d"), "sector": lambda: get_sector_strength(symbol)}
+        if self._news_due(snap): sources["news"] = lambda: fetch_news(f"{symbol} stock news")
+        got = {}
+        # publish each part as soon as it lands: news never holds up the price/score
+        for name, result in fetch_concurrently(sources):
+            got[name] = result
+            if name == "news":
+                if result is not None: self._publish(symbol, ready=False, news=result, news_at=time.time())
+            elif "bars" in got and "sector" in got:
+                bars = got["bars"]
+                data = get_quant_analysis(symbol, bars, got["sector"]) if bars is not None else None
+                if data: self._publish(symbol, data=data, bars=bars, bar_ts=bars.index[-1])
+                elif bars is not None: self._publish(symbol, bars=bars)
+                else: self._publish(symbol)
+
+    def refresh_market(self):
+        sources = {"quotes": get_index_quotes}
+        if time.time() - self.market.get("news_at", 0) >= self.news_interval:
+            sources["market_news"] = lambda: fetch_news(MARKET_QUERY)
+        got = dict(fetch_concurrently(sources))
+        market = dict(self.market)
+        if got.get("quotes") is not None:
+            market.update(indices=get_market_indices(got["quotes"]), sectors=sector_heatmap(got["quotes"]))
+        if got.get("market_news") is not None: market.update(news=got["market_news"], news_at=time.time())
+        self.market = market
+
+    def refresh(self, symbols):
+        jobs = [self._pool.submit(self.refresh_symbol, s) for s in symbols]
+        jobs.append(self._pool.submit(self.refresh_market))
+        for job in jobs:
+            try: job.result()
+            except Exception:
+                incr("errors.refresh")
+                log.exception("refresh job failed")
+        with self._lock:
+            snaps = [(s, self._snapshots.get(s)) for s in symbols]
+        self.alerts.evaluate({s: {**snap["data"]["row"], "bar_ts": snap["bar_ts"]}
+                              for s, snap in snaps if snap and snap.get("data")})
+
+    def run(self):
+        while True:
+            started = time.monotonic()
+            self._wake.clear()
+            with span("refresh.cycle"): self.refresh(sorted(self.symbols()))
+            log_snapshot()
+            self._wake.wait(max(0, self.interval - (time.monotonic() - started)))
+
+
+_REFRESHER = None
+_REFRESHER_LOCK = threading.Lock()
+
+
+def get_refresher():
+    """The process-wide Refresher, started on first use."""
+    global _REFRESHER
+    with _REFRESHER_LOCK:
+        if _REFRESHER is None:
+            _REFRESHER = Refresher()
+            _REFRESHER.start()
+            serve()
+        return _REFRESHER
@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from bars import BarSet
+from market_data import INTRADAY_DAYS, clean_ticker, get_live_panel, get_sector_map, get_stored_panel, to_yf_symbol
+from metrics import incr
+from scoring import score_frame
+from timeframes import mtf_panel
+
+SCAN_DTYPE = np.float32  # halves the per-symbol footprint of prices + indicators
+SCAN_CACHE_SIZE = 16     # scan tables kept (one per symbol set) before LRU eviction
+
+_TABLES = OrderedDict()  # (symbol set, last bar time) -> ranked table
+_TABLES_LOCK = threading.Lock()
+
+
+def _session_change_pct(panel, symbols):
+    """% move of each symbol from the open of the latest session (sector strength)."""
+    close, opens = panel['Close'][symbols], panel['Open'][symbols]
+    dates = close.index.normalize()
+    day_open = opens[dates == dates[-1]].bfill().iloc[0].to_numpy()
+    return (close.iloc[-1].to_numpy() - day_open) / day_open * 100
+
+
+def scan(tickers, interval="1m", period="5d", offline=False, store=None):
+    """Score every ticker and return a DataFrame ranked by score.
+
+    Live, bars come from the shared 1m window (market_data.get_live_panel: batched,
+    incremental downloads) and tables are cached per (symbol set, last bar time), so every
+    session scanning the same list shares one table, recomputed once per new minute bar
+    rather than per tick (shared, do not mutate). Offline reads `interval` / `period` from
+    the bar store (`store`, default BAR_STORE) and always recomputes."""
+    stocks = list(dict.fromkeys(clean_ticker(t) for t in tickers if t))
+    sectors = sorted({get_sector_map(t) for t in stocks})
+    if offline:
+        days = int(period[:-1]) if period.endswith("d") else INTRADAY_DAYS
+        panel = get_stored_panel(stocks + sectors, interval, days, store)
+        return None if panel is None else _rank(panel, stocks, sectors)
+
+    panel = get_live_panel(stocks + sectors)
+    if panel is None: return None
+    key = (frozenset(stocks), panel['Close'].index[-1])
+    with _TABLES_LOCK:
+        if key in _TABLES:
+            _TABLES.move_to_end(key)
+            incr("cache.scan.hit")
+            return _TABLES[key]
+    incr("cache.scan.miss")
+    table = _rank(panel, stocks, sectors)
+    with _TABLES_LOCK:
+        _TABLES[key] = table
+        while len(_TABLES) > SCAN_CACHE_SIZE: _TABLES.popitem(last=False)
+    return table
+
+
+def _rank(panel, stocks, sectors):
+    """Score the last bar of every stock in panel (sectors feed the sector rule)."""
+    close = panel['Close']
+    symbols = [s for s in map(to_yf_symbol, stocks) if s in close.columns and close[s].notna().any()]
+    if not symbols or len(close) < 2: return None
+    bars = BarSet.from_panel(panel, symbols, SCAN_DTYPE).compute_indicators()
+    latest = bars.row(-1)
+    latest.update({k: v[-1] for k, v in mtf_panel(bars.time, bars['High'], bars['Low'], bars['Close'], bars['Volume']).items()})
+    prev_close = bars['Close'][-2]
+
+    sector_cols = [s for s in sectors if s in close.columns]
+    sector_pct = dict(zip(sector_cols, _session_change_pct(panel, sector_cols))) if sector_cols else {}
+    latest['SECTOR_PCT'] = np.nan_to_num([sector_pct.get(get_sector_map(s), 0.0) for s in symbols])
+
+    score, signal = score_frame(latest)
+    table = pd.DataFrame({
+        "Symbol": [clean_ticker(s) for s in symbols],
+        "Score": score.astype(int),
+        "Signal": signal,
+        "LTP": latest['Close'],
+        "Chg %": (latest['Close'] - prev_close) / prev_close * 100,
+        "VWAP": latest['VWAP'],
+        "Stop Loss": latest['SUPERT_7_3.0'],
+    })
+    return table.sort_values("Score", ascending=False, kind="stable").reset_index(drop=True)
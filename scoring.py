@@ -0,0 +1,106 @@
+from collections import namedtuple
+
+import numpy as np
+
+from metrics import timed
+
+# column: indicator column (or a DERIVED name); op: ">", "<", "==" or "else";
+# threshold: a number or another column name; reason: formatted with value= and explain() context
+Rule = namedtuple("Rule", "column op threshold weight reason")
+
+# Each group is an if/elif/else chain: the first rule that matches a bar scores it.
+RULES = [
+    [Rule("SECTOR_PCT", ">", 0.2, 5, "🌍 **Sector ({sector}):** Bullish ({value:.2f}%)"),
+     Rule("SECTOR_PCT", "<", -0.2, -5, "🌍 **Sector ({sector}):** Bearish ({value:.2f}%)")],
+    [Rule("SUPERTd_7_3.0", "==", 1, 10, "📈 **SuperTrend:** Bullish"),
+     Rule("SUPERTd_7_3.0", "else", None, -10, "📉 **SuperTrend:** Bearish")],
+    [Rule("Close", ">", "VWAP", 10, "🏦 **VWAP:** Price > Inst. Avg"),
+     Rule("Close", "else", None, -10, "🏦 **VWAP:** Price < Inst. Avg")],
+    [Rule("RSI_14", "<", 30, 5, "🟢 **RSI:** Oversold ({value:.0f})"),
+     Rule("RSI_14", ">", 70, -5, "🔴 **RSI:** Overbought ({value:.0f})")],
+    [Rule("MACD_12_26_9", ">", "MACDs_12_26_9", 5, "🟢 **MACD:** Bullish Cross"),
+     Rule("MACD_12_26_9", "else", None, -5, "🔴 **MACD:** Bearish Cross")],
+    [Rule("MFI_14", "<", 20, 5, "💰 **MFI:** Accumulation"),
+     Rule("MFI_14", ">", 80, -5, "💰 **MFI:** Distribution")],
+    [Rule("ADX_14", ">", 25, 5, "💪 **ADX:** Strong Trend")],
+    [Rule("Close", ">", "CLOUD_TOP", 10, "☁️ **Ichimoku:** Above Cloud"),
+     Rule("Close", "<", "CLOUD_BOTTOM", -10, "☁️ **Ichimoku:** Below Cloud")],
+    [Rule("Close", ">", "BBU_20_2.0", -5, "💥 **BBands:** Upper Pierce"),
+     Rule("Close", "<", "BBL_20_2.0", 5, "💥 **BBands:** Lower Pierce")],
+    [Rule("CCI_20_0.015", ">", 100, 5, "🔄 **CCI:** Upside Momentum"),
+     Rule("CCI_20_0.015", "<", -100, -5, "🔄 **CCI:** Downside Momentum")],
+    [Rule("WILLR_14", "<", -80, 5, "📉 **Will%R:** Oversold"),
+     Rule("WILLR_14", ">", -20, -5, "📈 **Will%R:** Overbought")],
+    [Rule("MTF_TREND", "==", 3, 10, "🧭 **MTF:** 5m / 15m / 1h SuperTrend Bullish"),
+     Rule("MTF_TREND", "==", -3, -10, "🧭 **MTF:** 5m / 15m / 1h SuperTrend Bearish")],
+]
+
+# Columns computed from other columns at evaluation time. MTF_TREND sums the SuperTrend
+# directions of the last closed 5m / 15m / 1h bars (timeframes.mtf_indicators live,
+# timeframes.mtf_panel in the scanner and backtest); it is NaN when any timeframe is missing.
+DERIVED = {
+    "CLOUD_TOP": lambda f: np.fmax(_col(f, "ISA_9"), _col(f, "ISB_26")),
+    "CLOUD_BOTTOM": lambda f: np.fmin(_col(f, "ISA_9"), _col(f, "ISB_26")),
+    "MTF_TREND": lambda f: sum(_col(f, f"SUPERTd_7_3.0@{tf}") for tf in ("5m", "15m", "1h")),
+}
+
+BASE_SCORE = 50
+SIGNALS = [(">=", 75, "STRONG BUY"), (">=", 60, "BUY"), ("<=", 25, "STRONG SELL"), ("<=", 40, "SELL")]
+
+_OPS = {">": np.greater, "<": np.less, "==": np.equal, ">=": np.greater_equal, "<=": np.less_equal}
+
+
+def _col(frame, name):
+    """Column as a float array (float32 columns are used as-is, not copied).
+    Missing columns are all-NaN, so their rules never fire."""
+    if name in DERIVED: return DERIVED[name](frame)
+    n = len(np.atleast_1d(frame["Close"]))
+    if name not in frame: return np.full(n, np.nan)
+    values = np.atleast_1d(np.asarray(frame[name]))
+    if values.dtype.kind != "f": values = values.astype(float)
+    return np.broadcast_to(values, (n,))
+
+
+def matches(frame, rules=RULES):
+    """Index of the rule that fired in each group, per bar: int array (groups x bars), -1 = none."""
+    n = len(np.atleast_1d(frame["Close"]))
+    hits = np.full((len(rules), n), -1)
+    with np.errstate(invalid="ignore"):
+        for g, group in enumerate(rules):
+            conds = []
+            for rule in group:
+                if rule.op == "else":
+                    conds.append(np.ones(n, dtype=bool))
+                    continue
+                ref = _col(frame, rule.threshold) if isinstance(rule.threshold, str) else rule.threshold
+                conds.append(_OPS[rule.op](_col(frame, rule.column), ref))
+            hits[g] = np.select(conds, np.arange(len(group)), -1)
+    return hits
+
+
+def signal_for(score):
+    score = np.asarray(score)
+    return np.select([_OPS[op](score, level) for op, level, _ in SIGNALS], [s for *_, s in SIGNALS], "NEUTRAL")
+
+
+@timed("scoring")
+def score_frame(frame, rules=RULES):
+    """Score every bar of `frame` (DataFrame or {column: array}). Returns (score, signal) arrays."""
+    hits = matches(frame, rules)
+    score = np.full(hits.shape[1], BASE_SCORE)
+    for g, group in enumerate(rules):
+        weights = np.array([r.weight for r in group] + [0])
+        score += weights[hits[g]]  # -1 picks the trailing 0
+    score = np.clip(score, 0, 100)
+    return score, signal_for(score)
+
+
+def explain(frame, row=-1, rules=RULES, **context):
+    """Reason strings for one bar, in rule-table order."""
+    hits = matches(frame, rules)[:, row]
+    reasons = []
+    for group, hit in zip(rules, hits):
+        if hit < 0: continue
+        rule = group[hit]
+        reasons.append(rule.reason.format(value=_col(frame, rule.column)[row], **context))
+    return reasons
@@ -0,0 +1,57 @@
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+def rss(*items):
+    """RSS bytes for (title, link, published epoch) items."""
+    entries = "".join(f"<item><title>{title}</title><link>{link}</link><pubDate>{formatdate(published)}</pubDate>"
+                      f"<source url=\"https://example.com\">Example</source></item>" for title, link, published in items)
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{entries}</channel></rss>'.encode()
+
+
+class FeedServer:
+    """Local stand-in for a slow or failing upstream.
+
+    Replies are (status, body, headers, delay) served in order; the last one repeats.
+    `requests` keeps each request's headers.
+    """
+
+    rss = staticmethod(rss)
+
+    def __init__(self):
+        self.replies = [(200, rss(), {}, 0)]
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                status, body, headers, delay = server.replies.pop(0) if len(server.replies) > 1 else server.replies[0]
+                time.sleep(delay)
+                self.send_response(status)
+                for name, value in headers.items(): self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args): pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/rss"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def feed_server():
+    server = FeedServer()
+    yield server
+    server.close()
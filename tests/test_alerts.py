@@ -0,0 +1,79 @@
+import json
+
+from alerts import ALERTS, Alert, AlertEngine, FileSink
+
+TEST_ALERTS = [
+    Alert("vwap_up", "Close", ">", "VWAP", "{symbol} above VWAP at {price:.2f}"),
+    Alert("signal", "Signal", "changes", None, "{symbol}: {prev} -> {value}"),
+    Alert("score_high", "Score", ">=", 75, "{symbol} score {value:.0f}"),
+]
+
+
+def row(bar, close, vwap=100.0, score=50, signal="NEUTRAL"):
+    return {"bar_ts": bar, "Close": close, "VWAP": vwap, "Score": score, "Signal": signal}
+
+
+def names(events):
+    return sorted((e["symbol"], e["alert"]) for e in events)
+
+
+def test_first_row_only_primes():
+    engine = AlertEngine(TEST_ALERTS)
+    assert engine.evaluate({"A": row(1, 105, score=90, signal="BUY")}, now=0) == []
+
+
+def test_fires_on_the_bar_the_condition_becomes_true():
+    engine = AlertEngine(TEST_ALERTS, debounce=0)
+    engine.evaluate({"A": row(1, 99)}, now=0)
+    assert names(engine.evaluate({"A": row(2, 101)}, now=1)) == [("A", "vwap_up")]
+    assert engine.evaluate({"A": row(3, 102)}, now=2) == []  # still above: no new edge
+    engine.evaluate({"A": row(4, 99)}, now=3)
+    assert names(engine.evaluate({"A": row(5, 101, score=80, signal="BUY")}, now=4)) == \
+        [("A", "score_high"), ("A", "signal"), ("A", "vwap_up")]
+
+
+def test_unchanged_symbols_are_skipped():
+    engine = AlertEngine(TEST_ALERTS, debounce=0)
+    engine.evaluate({"A": row(1, 99), "B": row(1, 99)}, now=0)
+    engine.evaluate({"A": row(2, 99), "B": row(1, 99)}, now=1)
+    # B's last bar never changed, so its stored row is still bar 1 and it fires once it does
+    events = engine.evaluate({"A": row(2, 99), "B": row(2, 101)}, now=2)
+    assert names(events) == [("B", "vwap_up")]
+
+
+def test_debounce_per_symbol_and_alert():
+    engine = AlertEngine(TEST_ALERTS, debounce=300)
+    engine.evaluate({"A": row(1, 99), "B": row(1, 99)}, now=0)
+    assert names(engine.evaluate({"A": row(2, 101)}, now=10)) == [("A", "vwap_up")]
+    engine.evaluate({"A": row(3, 99)}, now=20)
+    # A's vwap_up is debounced; B's, and A's other alerts, are not
+    assert names(engine.evaluate({"A": row(4, 101, signal="BUY"), "B": row(4, 101)}, now=30)) == \
+        [("A", "signal"), ("B", "vwap_up")]
+    engine.evaluate({"A": row(5, 99, signal="BUY")}, now=320)
+    assert names(engine.evaluate({"A": row(6, 101, signal="BUY")}, now=330)) == [("A", "vwap_up")]
+
+
+def test_recent_newest_first_filtered_by_symbol():
+    engine = AlertEngine(TEST_ALERTS, debounce=0)
+    engine.evaluate({"A": row(1, 99), "B": row(1, 99)}, now=0)
+    engine.evaluate({"A": row(2, 101)}, now=1)
+    engine.evaluate({"B": row(2, 101)}, now=2)
+    assert [e["symbol"] for e in engine.recent()] == ["B", "A"]
+    assert [e["symbol"] for e in engine.recent(symbols=["A"])] == ["A"]
+
+
+def test_default_alerts_skip_missing_columns():
+    engine = AlertEngine(ALERTS)
+    engine.evaluate({"A": {"bar_ts": 1, "Close": 99.0, "Score": 50, "Signal": "NEUTRAL"}}, now=0)
+    events = engine.evaluate({"A": {"bar_ts": 2, "Close": 101.0, "Score": 80, "Signal": "STRONG BUY"}}, now=1)
+    assert names(events) == [("A", "score_high"), ("A", "signal"), ("A", "strong_buy")]
+
+
+def test_file_sink_writes_json_lines(tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    engine = AlertEngine(TEST_ALERTS, sinks=[FileSink(str(path))], debounce=0)
+    engine.evaluate({"A": row(1, 99)}, now=0)
+    events = engine.evaluate({"A": row(2, 101)}, now=1)
+    engine._pool.shutdown(wait=True)  # sinks run off the caller's thread
+    assert [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()] == events
+    assert events[0]["message"] == "A above VWAP at 101.00"
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pandas_ta")
+pytest.importorskip("yfinance")
+from backtest import _sector_pct, _trade_stats, simulate
+
+COST = 5 / 1e4  # default cost_bps + slippage_bps
+
+
+def run(close, score, stop=None, sessions=None, **kwargs):
+    close = np.asarray(close, float)[:, None]
+    score = np.asarray(score, float)[:, None]
+    stop = np.full(close.shape, np.nan) if stop is None else np.asarray(stop, float)[:, None]
+    sessions = np.zeros(len(close), int) if sessions is None else np.asarray(sessions)
+    if "mask" in kwargs: kwargs["mask"] = np.asarray(kwargs["mask"], bool)[:, None]
+    return simulate(close, score, stop, sessions, **kwargs)
+
+
+def test_position_held_while_score_above_buy():
+    target, _ = run([100] * 6, [70] * 6)
+    assert target[:, 0].tolist() == [1, 1, 1, 1, 1, 0]  # flat at the session's last bar
+
+
+def test_padded_bar_holds_position():
+    target, pnl = run([100, 101, 102, 102, 103, 104], [70] * 6, mask=[1, 1, 1, 0, 1, 1])
+    assert target[:, 0].tolist() == [1, 1, 1, 1, 1, 0]
+    assert np.isclose(pnl[:, 0].sum(), 104 / 100 - 1 - 2 * COST, atol=1e-3)
+
+
+def test_padded_bar_never_opens_a_position():
+    target, _ = run([100] * 5, [50, 70, 70, 70, 70], mask=[1, 0, 1, 1, 1])
+    assert target[:, 0].tolist() == [0, 0, 1, 1, 0]
+
+
+def test_stop_exits_until_next_session():
+    close = [100, 101, 98, 102, 103, 104]
+    stop = [99, 99.5, 99.5, 99.5, 100, 101]
+    target, _ = run(close, [70] * 6, stop, sessions=[0, 0, 0, 0, 1, 1])
+    assert target[:, 0].tolist() == [1, 1, 0, 0, 1, 0]
+
+
+def test_shorts_only_when_allowed():
+    assert run([100] * 3, [30] * 3)[0][:, 0].tolist() == [0, 0, 0]
+    assert run([100] * 3, [30] * 3, allow_short=True)[0][:, 0].tolist() == [-1, -1, 0]
+
+
+def test_trade_stats_counts_trades_and_winners():
+    close = [100, 102, 104, 104, 103, 102, 102]
+    target, pnl = run(close, [70, 70, 50, 30, 30, 50, 50], allow_short=True, flat_eod=False)
+    assert target[:, 0].tolist() == [1, 1, 0, -1, -1, 0, 0]
+    trades, winners = _trade_stats(target, pnl, COST)
+    assert trades.tolist() == [2] and winners.tolist() == [2]
+
+
+def test_sector_pct_is_session_change_as_of_each_bar():
+    tz = "Asia/Kolkata"
+    sector = pd.DataFrame({"Open": [100.0, 101, 200, 202], "Close": [101.0, 102, 202, 198]},
+                          index=pd.to_datetime(["2026-01-29 09:15", "2026-01-29 09:17",
+                                                "2026-01-30 09:15", "2026-01-30 09:16"]).tz_localize(tz))
+    index = pd.to_datetime(["2026-01-29 09:14", "2026-01-29 09:16", "2026-01-29 09:17",
+                            "2026-01-30 09:16", "2026-01-30 09:20"]).tz_localize(tz)
+    pct = _sector_pct(sector, index)
+    assert np.isnan(pct[0])
+    assert np.allclose(pct[1:], [1, 2, -1, -1])
+    assert np.isnan(_sector_pct(None, index)).all()
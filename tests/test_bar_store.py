@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("yfinance")
+from bar_store import BarStore
+from market_data import EXCHANGE_TZ, IntradayBarStore
+
+DAYS = 5
+
+
+def bars(sessions, start="09:15", end="15:29"):
+    """1m bars for the last `sessions` weekdays up to today, between start and end (IST)."""
+    days = pd.bdate_range(end=pd.Timestamp.now(tz=EXCHANGE_TZ).date(), periods=sessions)
+    index = pd.DatetimeIndex([t for d in days for t in pd.date_range(f"{d.date()} {start}", f"{d.date()} {end}", freq="min")])
+    close = np.linspace(100, 110, len(index))
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000.0},
+                        index=index.tz_localize(EXCHANGE_TZ))
+
+
+class Loaders:
+    def __init__(self):
+        self.full = self.since = 0
+        self.batches = []
+
+    def full_loader(self, symbol, interval, period):
+        self.full += 1
+        return bars(DAYS)
+
+    def since_loader(self, symbol, start):
+        self.since += 1
+        return None
+
+    def batch_loader(self, symbols, period=None, start=None):
+        self.batches.append((sorted(symbols), period, start))
+        df = bars(DAYS)
+        return {s: df if start is None else df[df.index >= start] for s in symbols}
+
+
+def intraday(tmp_path, stored):
+    store = BarStore(str(tmp_path), tz=EXCHANGE_TZ)
+    if stored is not None: store.write("RELIANCE", stored)
+    loaders = Loaders()
+    return IntradayBarStore(DAYS, full_loader=loaders.full_loader, since_loader=loaders.since_loader,
+                            batch_loader=loaders.batch_loader, store=store), store, loaders
+
+
+def test_resumes_from_a_complete_store(tmp_path):
+    live, _, loaders = intraday(tmp_path, bars(DAYS))
+    df = live.refresh("RELIANCE.NS")
+    assert (loaders.full, loaders.since) == (0, 1)
+    assert df.index.normalize().nunique() == DAYS
+
+
+def first_filled_midday():
+    df = bars(DAYS)
+    return df[df.index >= df.index[0].normalize() + pd.Timedelta("14h")]
+
+
+@pytest.mark.parametrize("stored", [bars(2), first_filled_midday()], ids=["too few sessions", "first session starts mid-day"])
+def test_incomplete_store_is_backfilled(tmp_path, stored):
+    live, store, loaders = intraday(tmp_path, stored)
+    df = live.refresh("RELIANCE.NS")
+    assert (loaders.full, loaders.since) == (1, 0)
+    assert df.index.normalize().nunique() == DAYS
+    on_disk = store.read("RELIANCE", days=DAYS)
+    assert len(on_disk) == len(bars(DAYS)) and on_disk.index[0].strftime("%H:%M") == "09:15"
+
+
+def test_single_session_read_is_a_view_of_the_file(tmp_path):
+    store = BarStore(str(tmp_path), tz=EXCHANGE_TZ)
+    store.write("RELIANCE", bars(2))
+    one, both = store.read("RELIANCE", days=1), store.read("RELIANCE")
+    assert not one["Close"].to_numpy().flags.writeable  # memory-mapped, not copied
+    assert np.array_equal(both["Close"].to_numpy(), bars(2)["Close"].to_numpy())
+
+
+def test_refresh_many_batches_and_reuses_fresh_frames(tmp_path):
+    live, _, loaders = intraday(tmp_path, bars(DAYS))  # RELIANCE.NS stored, TCS.NS not
+    live.refresh_many(["RELIANCE.NS", "TCS.NS"])
+    assert loaders.batches[0][0] == ["RELIANCE.NS"] and loaders.batches[0][2] is not None  # resumed from the store
+    assert loaders.batches[1][:2] == (["TCS.NS"], f"{DAYS}d")                              # full window
+    out = live.refresh_many(["RELIANCE.NS", "TCS.NS"])
+    assert len(loaders.batches) == 2 and set(out) == {"RELIANCE.NS", "TCS.NS"}             # within the TTL
+    live.refresh_many(["RELIANCE.NS", "TCS.NS"], ttl=0)
+    assert loaders.batches[2][:2] == (["RELIANCE.NS", "TCS.NS"], None)                     # one incremental call
+    assert live.get("TCS.NS").index.normalize().nunique() == DAYS
@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from fetchers import fetch_concurrently
+from metrics import METRICS
+
+
+def counter(name):
+    return METRICS.snapshot()["counters"].get(name, 0)
+
+
+@pytest.fixture
+def pool():
+    pool = ThreadPoolExecutor(max_workers=4)
+    yield pool
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def sleeper(seconds, value, release=None):
+    def fn():
+        if release: release.wait(seconds)
+        else: time.sleep(seconds)
+        return value
+    return fn
+
+
+def test_results_arrive_as_they_complete(pool):
+    start = time.monotonic()
+    arrived = [(name, result, time.monotonic() - start) for name, result in
+               fetch_concurrently({"slow": sleeper(0.4, 3), "fast": sleeper(0, 1), "mid": sleeper(0.1, 2)}, pool=pool)]
+    assert [(name, result) for name, result, _ in arrived] == [("fast", 1), ("mid", 2), ("slow", 3)]
+    assert arrived[0][2] < 0.2  # not held back by the slow source
+
+
+def test_slow_source_times_out(pool):
+    release, before = threading.Event(), counter("timeouts.t_slow")
+    start = time.monotonic()
+    got = list(fetch_concurrently({"t_slow": sleeper(5, "late", release), "t_fast": sleeper(0, "ok")},
+                                  timeouts={"t_slow": 0.2}, pool=pool))
+    elapsed = time.monotonic() - start
+    release.set()
+    assert got == [("t_fast", "ok"), ("t_slow", None)]
+    assert 0.2 <= elapsed < 1
+    assert counter("timeouts.t_slow") == before + 1
+
+
+def test_failing_source_yields_none(pool):
+    def boom(): raise ConnectionError("upstream down")
+    before = counter("errors.t_boom")
+    got = dict(fetch_concurrently({"t_boom": boom, "t_ok": sleeper(0, "ok")}, pool=pool))
+    assert got == {"t_boom": None, "t_ok": "ok"}
+    assert counter("errors.t_boom") == before + 1
+
+
+def download_stand_in(delay=0, fail=False):
+    """yf.download stand-in: one day of flat 1m bars per requested symbol."""
+    calls = []
+
+    def download(tickers, period=None, interval="1m", start=None, group_by="column", progress=False):
+        calls.append(tickers)
+        time.sleep(delay)
+        if fail: raise ConnectionError("yahoo down")
+        symbols = tickers.split()
+        index = pd.date_range("2024-01-02 09:15", periods=3, freq="min", tz="Asia/Kolkata")
+        frames = {s: pd.DataFrame({f: 100.0 for f in ("Open", "High", "Low", "Close", "Volume")}, index=index)
+                  for s in symbols}
+        return pd.concat(frames, axis=1).swaplevel(0, 1, axis=1)
+    download.calls = calls
+    return download
+
+
+def test_downloader_can_be_swapped(monkeypatch):
+    pytest.importorskip("yfinance")
+    import market_data
+    stand_in = download_stand_in()
+    monkeypatch.setattr(market_data, "DOWNLOAD", stand_in)
+    frames = market_data.download_frames(["A.NS", "B.NS"])
+    assert sorted(frames) == ["A.NS", "B.NS"] and len(frames["A.NS"]) == 3
+    assert len(market_data.download_bars("A.NS", "1m", "1d")) == 3
+    assert stand_in.calls == ["A.NS B.NS", "A.NS"]
+
+
+def test_stand_in_sources(monkeypatch, pool, feed_server):
+    """Slow Yahoo, failing sector source and a local news feed: news still lands."""
+    pytest.importorskip("yfinance")
+    pytest.importorskip("feedparser")
+    import market_data
+    from news import NewsService
+    monkeypatch.setattr(market_data, "DOWNLOAD", download_stand_in(delay=1))
+    feed_server.replies = [(200, feed_server.rss(("Story", "https://example.com/1", time.time())), {}, 0)]
+    sources = {"bars": lambda: market_data.download_bars("A.NS", "1m", "1d"),
+               "sector": lambda: download_stand_in(fail=True)("^NSEI"),
+               "news": lambda: NewsService(url=feed_server.url).get("A stock news")}
+    got = dict(fetch_concurrently(sources, timeouts={"bars": 0.3}, pool=pool))
+    assert got["bars"] is None and got["sector"] is None
+    assert [item["title"] for item in got["news"]] == ["Story"]
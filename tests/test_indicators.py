@@ -0,0 +1,17 @@
+import glob
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pandas_ta")
+from indicators import check_parity
+
+# Recorded OHLCV bars (e.g. get_bars(...).to_csv()); every CSV dropped here is checked
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "*.csv")))
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_streaming_matches_batch(path):
+    bars = pd.read_csv(path, index_col=0, parse_dates=[0])
+    assert check_parity(bars) == {}
@@ -0,0 +1,83 @@
+import time
+import urllib.error
+
+import pytest
+
+pytest.importorskip("feedparser")
+from metrics import METRICS
+from news import NewsService, dedupe, parse_feed, time_ago
+
+NOW = 1_700_000_000
+
+
+def counter(name):
+    return METRICS.snapshot()["counters"].get(name, 0)
+
+
+def item(title, link):
+    return {"title": title, "link": link, "source": "", "published": None}
+
+
+def test_dedupe_same_link_or_headline():
+    first = [item("Markets rally - Mint", "a"), item("Rupee slips", "b")]
+    second = [item("Markets rally - ET", "c"), item("Other story", "b"), item("Fresh story", "d")]
+    kept = dedupe(first, second)
+    assert [i["link"] for i in kept[0]] == ["a", "b"]
+    assert [i["link"] for i in kept[1]] == ["d"]  # syndicated headline and repeated link dropped
+
+
+def test_parse_feed_newest_first_and_deduped(feed_server):
+    body = feed_server.rss(("Old story - Mint", "https://x/1", NOW - 600), ("New story", "https://x/2", NOW),
+                           ("Old story - ET", "https://x/3", NOW - 300))
+    items = parse_feed(body)
+    assert [i["title"] for i in items] == ["New story", "Old story - ET"]
+    assert items[0]["published"] == NOW and items[0]["source"] == "Example"
+
+
+def test_time_ago():
+    assert time_ago(None) == "Just now"
+    assert time_ago(NOW - 300, now=NOW) == "5m ago"
+    assert time_ago(NOW - 7200, now=NOW) == "2h ago"
+
+
+def test_fresh_feed_served_from_memory(feed_server):
+    service = NewsService(url=feed_server.url, ttl=60)
+    feed_server.replies = [(200, feed_server.rss(("Story", "https://x/1", NOW)), {}, 0)]
+    assert service.get("q") == service.get("q")
+    assert len(feed_server.requests) == 1
+
+
+def test_revalidates_with_etag(feed_server):
+    service = NewsService(url=feed_server.url, ttl=0)
+    feed_server.replies = [(200, feed_server.rss(("Story", "https://x/1", NOW)), {"ETag": '"v1"'}, 0),
+                           (304, b"", {}, 0)]
+    before = counter("cache.news.not_modified")
+    first = service.get("q")
+    assert service.get("q") == first
+    assert feed_server.requests[1].get("If-None-Match") == '"v1"'
+    assert counter("cache.news.not_modified") == before + 1
+
+
+def test_server_error_keeps_cached_items(feed_server):
+    service = NewsService(url=feed_server.url, ttl=0)
+    feed_server.replies = [(200, feed_server.rss(("Story", "https://x/1", NOW)), {}, 0), (500, b"", {}, 0)]
+    before = counter("errors.news")
+    first = service.get("q")
+    assert [i["title"] for i in service.get("q")] == ["Story"] == [i["title"] for i in first]
+    assert counter("errors.news") == before + 1
+
+
+def test_error_without_cache_raises(feed_server):
+    feed_server.replies = [(500, b"", {}, 0)]
+    with pytest.raises(urllib.error.HTTPError):
+        NewsService(url=feed_server.url).get("q")
+
+
+def test_slow_feed_times_out_to_cache(feed_server):
+    service = NewsService(url=feed_server.url, ttl=0)
+    feed_server.replies = [(200, feed_server.rss(("Story", "https://x/1", NOW)), {}, 0),
+                           (200, feed_server.rss(("Late", "https://x/2", NOW)), {}, 1)]
+    service.get("q")
+    start = time.monotonic()
+    assert [i["title"] for i in service.get("q", timeout=0.2)] == ["Story"]
+    assert time.monotonic() - start < 1
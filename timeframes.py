@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from bars import epoch_seconds
+from indicators import compute_panel, latest_indicators
+from market_data import BAR_CACHE_SIZE, EXCHANGE_TZ, IST_OFFSET, SESSION_CLOSE, SESSION_OPEN
+from metrics import span
+
+TIMEFRAMES = {"5m": 5, "15m": 15, "1h": 60}  # name -> minutes, all built from 1m bars
+MTF_COLUMNS = ("SUPERTd_7_3.0",)  # higher-timeframe columns the score reads (scoring.MTF_TREND)
+
+
+def bucket_starts(times, minutes):
+    """Epoch second each 1m bar's `minutes` bucket starts at. Buckets are anchored to the
+    09:15 IST open and never cross a session (the last hour is 15:15-15:30); stray bars
+    outside the session fold into its first / last bucket."""
+    local = np.asarray(times, dtype=np.int64) + IST_OFFSET
+    midnight = local - local % 86400
+    since_open = np.clip(local - midnight - SESSION_OPEN * 60, 0, (SESSION_CLOSE - SESSION_OPEN) * 60 - 1)
+    return midnight + SESSION_OPEN * 60 + since_open - since_open % (minutes * 60) - IST_OFFSET
+
+
+def resample(df, minutes):
+    """OHLCV 1m frame -> `minutes` bars (index = bucket start)."""
+    if df is None or df.empty: return None
+    starts = bucket_starts(epoch_seconds(df.index), minutes)
+    edges = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[edges[1:] - 1, len(starts) - 1]
+    o, h, l, c, v = (df[f].to_numpy(dtype=float) for f in ('Open', 'High', 'Low', 'Close', 'Volume'))
+    index = pd.to_datetime(starts[edges], unit="s", utc=True).tz_convert(df.index.tz or EXCHANGE_TZ)
+    return pd.DataFrame({"Open": o[edges], "High": np.maximum.reduceat(h, edges), "Low": np.minimum.reduceat(l, edges),
+                         "Close": c[last], "Volume": np.add.reduceat(v, edges)}, index=index)
+
+
+class TimeframeCache:
+    """Higher-timeframe frames per (key, timeframe), kept in step with a growing 1m frame.
+
+    Each update re-aggregates only the 1m bars from the last (still-forming) bucket on and
+    drops buckets that fell out of the 1m window, so a tick costs a few bars, not 5 days.
+    Holds the timeframes of `maxsize` keys (as many symbols as IntradayBarStore), LRU-evicted.
+    """
+
+    def __init__(self, maxsize=BAR_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._frames = OrderedDict()  # (key, timeframe) -> DataFrame
+        self._lock = threading.Lock()
+
+    def get(self, key, df, timeframe):
+        minutes = TIMEFRAMES[timeframe]
+        with self._lock:
+            prev = self._frames.get((key, timeframe))
+        if prev is None or not df.index[0] <= prev.index[-1] <= df.index[-1]:
+            frame = resample(df, minutes)
+        else:
+            tail = resample(df.iloc[df.index.searchsorted(prev.index[-1]):], minutes)
+            frame = prev.iloc[:-1] if tail is None else pd.concat([prev[prev.index < tail.index[0]], tail])
+            first = pd.Timestamp(int(bucket_starts(epoch_seconds(df.index[:1]), minutes)[0]), unit="s", tz="UTC")
+            frame = frame[frame.index >= first]
+        with self._lock:
+            self._frames[key, timeframe] = frame
+            self._frames.move_to_end((key, timeframe))
+            while len(self._frames) > self.maxsize * len(TIMEFRAMES): self._frames.popitem(last=False)
+        return frame
+
+
+TIMEFRAME_CACHE = TimeframeCache()
+
+
+def mtf_indicators(key, df, timeframes=TIMEFRAMES):
+    """Indicator values of the last closed bar on each higher timeframe of the 1m frame df,
+    flattened to {"<column>@<timeframe>": value} so they sit next to the 1m columns for
+    scoring. The bucket holding df's last bar is still forming and is left out, which is
+    what mtf_panel sees at every bar of a backtest."""
+    out = {}
+    with span("indicators.mtf"):
+        for tf in timeframes:
+            frame = TIMEFRAME_CACHE.get(key, df, tf)
+            if frame is None or len(frame) < 3: continue
+            out.update({f"{col}@{tf}": value for col, value in latest_indicators(f"{key}@{tf}", frame.iloc[:-1]).items()})
+    return out
+
+
+def mtf_panel(times, high, low, close, volume, timeframes=TIMEFRAMES, columns=MTF_COLUMNS):
+    """mtf_indicators for every row of a 1m (bars x symbols) panel: {"<column>@<timeframe>":
+    2D array}, each bar seeing the last bucket closed before its own (NaN until two have).
+    `times` are the rows' epoch seconds; the buckets go through compute_panel in one pass."""
+    out = {}
+    with span("indicators.mtf_panel"):
+        for tf, minutes in timeframes.items():
+            starts = bucket_starts(times, minutes)
+            first = np.r_[True, starts[1:] != starts[:-1]]
+            edges = np.flatnonzero(first)
+            last = np.r_[edges[1:] - 1, len(starts) - 1]
+            ind = compute_panel(np.fmax.reduceat(high, edges, axis=0), np.fmin.reduceat(low, edges, axis=0), close[last],
+                                np.add.reduceat(np.nan_to_num(volume), edges, axis=0), (starts[edges] + IST_OFFSET) // 86400)
+            closed = np.cumsum(first) - 2  # previous bucket per row, -1 inside the first one
+            for col in columns:
+                out[f"{col}@{tf}"] = np.where((closed >= 1)[:, None], ind[col][np.maximum(closed, 0)], np.nan)
+    return out